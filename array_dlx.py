@@ -0,0 +1,906 @@
+# Imports
+from array import array
+import time
+from main import FourWayLinkedList, n_queen_column_count
+from time_budget import TimeBudgetExceeded
+from step_logger import log_hooks
+
+
+# Class declaration for the array backed list object.
+# This is the same four way linked list as FourWayLinkedList, however instead of a Node/Column object per 1 in the
+# matrix, every link is stored as an integer in a flat array, as in Knuth's later DLX programs.
+# Index 0 is the master node, indices 1 to the number of columns are the column headers and every index after that
+# is a regular node. For each index:
+#   left/right/up/down = the index of the neighbouring node/column header
+#   column = the index of the column header the node belongs to (a column header points to itself)
+#   row = the index of the matrix row the node came from (-1 for the master node and column headers)
+# The size array is indexed by column header, the primary/names lists hold the remaining column header attributes.
+# row_nodes holds the index of the first node of each matrix row (-1 for an empty row).
+# The file functions of FourWayLinkedList are shared, everything that walks the links is overridden below.
+class ArrayLinkedList(FourWayLinkedList):
+    def __init__(self, main_file_name="main_output.txt", log_file_name="log.txt"):
+        super().__init__(main_file_name, log_file_name)
+        self.engine = "array"
+        self.master_node = 0            # The master node is always index 0
+        self.left = array('i', [0])     # Links for the master node, which starts linked to itself
+        self.right = array('i', [0])
+        self.up = array('i', [0])
+        self.down = array('i', [0])
+        self.column = array('i', [0])
+        self.row = array('i', [-1])
+        self.size = array('i', [0])
+        self.primary = [False]          # The master node is never primary, see dlx
+        self.names = ["Master"]
+
+    # Helper function: Number of column headers in the list object
+    # Arguments: None
+    # Return: number of columns
+    def column_count(self):
+        return len(self.names) - 1
+
+    # Helper function: Appends a new index to every link array
+    # Arguments: left/right/up/down/column/row = the initial values of the new index
+    # Return: the new index
+    def new_index(self, left, right, up, down, column, row):
+        self.left.append(left)
+        self.right.append(right)
+        self.up.append(up)
+        self.down.append(down)
+        self.column.append(column)
+        self.row.append(row)
+        return len(self.left) - 1
+
+    # Specific N-Queens function: Transform the column headers to resemble the N-Queens problem.
+    # Identical naming to FourWayLinkedList.transform_n_queen
+    # Arguments: n = number of ranks/files of the board
+    # write_file = if False the main output file is not touched, used when only counting solutions
+    # Return: None
+    def transform_n_queen(self, n, write_file=True):
+        for i in range(n_queen_column_count(n)):
+            c = i + 1
+            if i < n:   # Ranks
+                self.names[c] = "Rank {0}".format(i + 1)
+            elif i < 2*n:   # Files
+                self.names[c] = "File {0}".format(int((i % n) + 1))
+            elif i < (4*n - 3): # Diagonals
+                self.names[c] = "Diagonal {0}".format(int((i % (2*n)) + 1))
+                self.primary[c] = False
+            else:   # Back Diagonals
+                self.names[c] = "Back Diagonal {0}".format(int((i % (4*n - 3)) + 1))
+                self.primary[c] = False
+        if write_file:
+            self.file_write_n_queen(n)
+        self.create_original_header_list()
+        return None
+
+    # Helper function: Names the column headers and marks the non-primary ones, see FourWayLinkedList.set_columns
+    # Arguments: names = list of the names of the columns, n_primary = (optional) the number of primary columns
+    # Return: None
+    def set_columns(self, names, n_primary=None):
+        if len(names) != len(self.names) - 1:
+            raise ValueError("{0} names given for {1} columns".format(len(names), len(self.names) - 1))
+        for i, name in enumerate(names):
+            self.names[i + 1] = name
+            self.primary[i + 1] = n_primary is None or i < n_primary
+        self.create_original_header_list()
+        return None
+
+    # Debug function: Prints all of the uncovered column headers, along with their size
+    # Arguments: None
+    # Return: None
+    def print(self):
+        c = self.right[0]
+        while c != 0:
+            print(self.names[c], self.size[c])
+            c = self.right[c]
+        return None
+
+    # Debug function: Prints the solution list to the standard console output
+    # Arguments: None
+    # Return: None
+    def print_solution(self):
+        print("Solution")
+        for node in self.solution_list:
+            print(self.names[self.column[node]], self.names[self.column[self.right[node]]])
+        print("End Solution")
+        return None
+
+    # Helper function: Initialises the header list with the names of the column headers, in their original order
+    # Arguments: None
+    # Return: None
+    def create_original_header_list(self):
+        self.header_list = self.names[1:]
+        return None
+
+    # Helper function: Finds the furthest left node in a row.
+    # The nodes of each row are created from left to right, so this is the first node of the node's row.
+    # Arguments: node = a node in the row to be searched
+    # Return: the furthest left node
+    def find_furthest_left(self, node):
+        return self.row_nodes[self.row[node]]
+
+    # File function: Used to write a single solution to either output file, see FourWayLinkedList.file_write_solution
+    # Arguments: main_file = boolean value, true for the main file, false for the log file
+    # nodes = (optional) one node of each row of the solution, by default the solution list
+    # Return: None
+    def file_write_solution(self, main_file=True, nodes=None):
+        if nodes is None:
+            nodes = self.solution_list
+        if main_file:
+            self.total_solutions = self.total_solutions + 1
+            file = open(self.main_file, "a")
+        else:
+            file = open(self.log_file, "a")
+        if self.total_solutions == 1:
+            file.write("\n\nSolutions:\n\n")
+        file.write("Solution {0}\n".format(self.total_solutions))
+        for node in nodes:
+            first = self.find_furthest_left(node)
+            file.write(self.names[self.column[first]])
+            file.write(", ")
+            file.write(self.names[self.column[self.right[first]]])
+            file.write("\n")
+        file.write("\n")
+        file.close()
+        return None
+
+    # Core function: Links the column headers and rows into the arrays, see FourWayLinkedList.build_from_rows
+    # The dense and sparse conversion functions of FourWayLinkedList both end up here.
+    # Arguments: rows = iterable of column index lists, one per row of the matrix
+    # n_columns = the number of columns of the matrix
+    # Return: master_node = the index of the master node
+    def build_from_rows(self, rows, n_columns):
+        # Create the column headers, each linked to itself vertically
+        for i in range(n_columns):
+            c = self.new_index(i, 0, i + 1, i + 1, i + 1, -1)
+            self.right[i] = c
+            self.left[0] = c
+            self.size.append(0)
+            self.primary.append(True)
+            self.names.append("Constraint {0}".format(i))
+        left, right, up, down, size = self.left, self.right, self.up, self.down, self.size
+        # Create each row, from left to right
+        for i, row in enumerate(rows):
+            first = -1
+            previous = None
+            for j in sorted(row):
+                if j < 0 or j >= n_columns:
+                    raise ValueError("Column index {0} is outside the matrix".format(j))
+                if j == previous:
+                    raise ValueError("Column index {0} is given twice in row {1}".format(j, i))
+                previous = j
+                c = j + 1
+                bottom = up[c]  # The tail of the column
+                node = self.new_index(0, 0, bottom, c, c, i)
+                down[bottom] = node
+                up[c] = node
+                size[c] = size[c] + 1
+                if first == -1:
+                    first = node
+                    left[node], right[node] = node, node
+                else:
+                    last = left[first]
+                    left[node], right[node] = last, first
+                    right[last] = node
+                    left[first] = node
+            self.row_nodes.append(first)
+        self.create_original_header_list()
+        return self.master_node
+
+    # DLX helper function: Cover a column of the list object, see FourWayLinkedList.cover_column
+    # Arguments: c = the index of the column header to be covered
+    # Return: updates = the number of nodes unlinked from their columns
+    def cover_column(self, c):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[c]] = right[c]
+        left[right[c]] = left[c]
+        updates = 0
+        i = down[c]
+        while i != c:
+            j = right[i]
+            while j != i:
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                size[column[j]] -= 1
+                updates += 1
+                j = right[j]
+            i = down[i]
+        return updates
+
+    # DLX helper function: Uncover a column of the list object, see FourWayLinkedList.uncover_column
+    # Arguments: c = the index of the column header to be uncovered
+    # Return: None
+    def uncover_column(self, c):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[c]
+        while i != c:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[c]] = c
+        left[right[c]] = c
+        return None
+
+    # DLX helper function: Find the column with the smallest size to cover, see FourWayLinkedList.find_best_column
+    # Arguments: None
+    # Return: the index of the best column header
+    def find_best_column(self):
+        right, size, primary = self.right, self.size, self.primary
+        c = right[0]
+        best = c
+        while c != 0:
+            if size[c] < size[best] and primary[c]:
+                best = c
+            c = right[c]
+        return best
+
+    # DLX helper function: Check to see if any primary column has size=0, see FourWayLinkedList.dead_constraint
+    # Arguments: logger = (optional) the StepLogger to record the backtrack with
+    # Return: True if a backtrack is necessary
+    def dead_constraint(self, logger=None):
+        right, size, primary = self.right, self.size, self.primary
+        c = right[0]
+        while c != 0:
+            if primary[c] and size[c] <= 0:
+                if logger is not None and logger.backtracks:
+                    logger.backtrack(c - 1)
+                return True
+            c = right[c]
+        return False
+
+    # DLX helper function: Chooses whole rows before a search, see FourWayLinkedList.select_rows
+    # The rows are covered in the arrays themselves, so the copies made by search_links start from them.
+    # Arguments: rows = the indices of the rows to choose, in order
+    # Return: None
+    def select_rows(self, rows):
+        right, column = self.right, self.column
+        for row in rows:
+            node = self.row_nodes[row]
+            self.cover_column(column[node])
+            r = right[node]
+            while r != node:
+                self.cover_column(column[r])
+                r = right[r]
+            self.solution_list.append(node)
+            self.prefix_length = self.prefix_length + 1
+        return None
+
+    # DLX helper function: Undoes the last rows chosen by select_rows, see FourWayLinkedList.unselect_rows
+    # Arguments: count = the number of rows to undo, by default all of them
+    # Return: None
+    def unselect_rows(self, count=None):
+        left, column = self.left, self.column
+        if count is None:
+            count = self.prefix_length
+        del self.solution_list[self.prefix_length:]
+        for _ in range(count):
+            node = self.solution_list.pop()
+            r = left[node]
+            while r != node:
+                self.uncover_column(column[r])
+                r = left[r]
+            self.uncover_column(column[node])
+            self.prefix_length = self.prefix_length - 1
+        return None
+
+    # DLX helper function: The rows search would branch on next, see FourWayLinkedList.best_column_rows
+    # Arguments: None
+    # Return: None for a solution, otherwise the row indices of the best column (empty at a dead constraint)
+    def best_column_rows(self):
+        if not self.primary[self.right[0]]:
+            return None
+        if self.dead_constraint():
+            return []
+        c = self.find_best_column()
+        rows = []
+        node = self.down[c]
+        while node != c:
+            rows.append(self.row[node])
+            node = self.down[node]
+        return rows
+
+    # DLX helper function: Copies the link arrays into plain lists for the search.
+    # CPython reads and writes list items considerably faster than array items (searching the arrays directly is about
+    # 3x slower), so the search dances on these copies while the arrays remain the compact stored form. Every link is
+    # restored by the end of the search, so the copies never need to be written back.
+    # The copies are not free: the arrays only save memory while no search runs. All six lists take their integers
+    # from one shared table (one int object per index), rather than tolist() making an int per item of every list,
+    # which brings the peak during a search down to about that of the object engine.
+    # Arguments: None
+    # Return: tuple of the left, right, up, down, column and size lists
+    def search_links(self):
+        index = list(range(len(self.left))).__getitem__
+        return tuple(list(map(index, links)) for links in (self.left, self.right, self.up, self.down, self.column,
+                                                              self.size))
+
+    # Main DLX function: the same recursive search as FourWayLinkedList.dlx, on the integer links
+    # Arguments: k = depth of the algorithm, log = boolean value or log level, see step_logging
+    # Return: None
+    def dlx(self, k, log=True):
+        with self.step_logging(log) as logger:
+            self.dlx_links(k, logger, self.search_links())
+        return None
+
+    # DLX helper function: The recursive search itself, see dlx
+    # The column choice, dead constraint check and cover/uncover are written out inline here, as the method calls
+    # would otherwise cost more than the link updates themselves. The search order is unchanged.
+    # Arguments: k = depth of the algorithm, logger = the StepLogger of the run, or None
+    # links = the lists returned by search_links
+    # Return: None
+    def dlx_links(self, k, logger, links):
+        left, right, up, down, column, size = links
+        primary = self.primary
+        if not primary[right[0]]:
+            del self.solution_list[k:]
+            self.file_write_solution(True)
+            if logger is not None and logger.solutions:
+                logger.solution(self.total_solutions, self.solution_rows())
+            return None
+        # One pass over the header ring: check for dead constraints and find the best column together
+        c = right[0]
+        best = c
+        best_size = size[c]
+        while c != 0:
+            if primary[c]:
+                s = size[c]
+                if s <= 0:
+                    if logger is not None and logger.backtracks:
+                        logger.backtrack(c - 1)
+                    return None
+                if s < best_size:
+                    best, best_size = c, s
+            c = right[c]
+        # Cover the best column
+        right[left[best]] = right[best]
+        left[right[best]] = left[best]
+        i = down[best]
+        while i != best:
+            j = right[i]
+            while j != i:
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+        node = down[best]
+        while node != best:
+            self.set_solution_k(node, k)
+            if logger is not None and logger.branches:
+                logger.branch(self.row[node], k)
+            # Cover the other columns of this row
+            r = right[node]
+            while r != node:
+                c = column[r]
+                right[left[c]] = right[c]
+                left[right[c]] = left[c]
+                i = down[c]
+                while i != c:
+                    j = right[i]
+                    while j != i:
+                        up[down[j]] = up[j]
+                        down[up[j]] = down[j]
+                        size[column[j]] -= 1
+                        j = right[j]
+                    i = down[i]
+                r = right[r]
+            self.dlx_links(k + 1, logger, links)
+            # Uncover them again, right to left
+            r = left[node]
+            while r != node:
+                c = column[r]
+                i = up[c]
+                while i != c:
+                    j = left[i]
+                    while j != i:
+                        size[column[j]] += 1
+                        up[down[j]] = j
+                        down[up[j]] = j
+                        j = left[j]
+                    i = up[i]
+                right[left[c]] = c
+                left[right[c]] = c
+                r = left[r]
+            node = down[node]
+        # Uncover the best column
+        i = up[best]
+        while i != best:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[best]] = best
+        left[right[best]] = best
+        return None
+
+    # Helper function: The matrix rows of the current solution, in the order they were chosen
+    # Arguments: None
+    # Return: list of row indices
+    def solution_rows(self):
+        return [self.row[node] for node in self.solution_list]
+
+    # Helper function: Names a row as it appears in the output, see FourWayLinkedList.row_label
+    # Arguments: row = the index of the row
+    # Return: string, e.g. "Rank 3, File 5"
+    def row_label(self, row):
+        first = self.row_nodes[row]   # The first node of a row is its furthest left
+        return self.names[self.column[first]] + ", " + self.names[self.column[self.right[first]]]
+
+    # Helper function: The names of the columns of a row, see FourWayLinkedList.row_names
+    # Arguments: row = the index of the row
+    # Return: list of strings
+    def row_names(self, row):
+        first = self.row_nodes[row]
+        names = [self.names[self.column[first]]]
+        node = self.right[first]
+        while node != first:
+            names.append(self.names[self.column[node]])
+            node = self.right[node]
+        return names
+
+    # Helper function: The name of a column, see FourWayLinkedList.column_name
+    # Arguments: index = the original index of the column
+    # Return: string
+    def column_name(self, index):
+        return self.names[index + 1]
+
+    # Helper function: The number of primary columns, see FourWayLinkedList.primary_column_count
+    # Arguments: None
+    # Return: integer
+    def primary_column_count(self):
+        return sum(self.primary[1:])
+
+    # Helper function: Reads the matrix back out of the arrays, see FourWayLinkedList.matrix_rows
+    # Arguments: None
+    # Return: list of column index lists, one per row of the matrix
+    def matrix_rows(self):
+        rows = []
+        for first in self.row_nodes:
+            row = []
+            if first != -1:
+                node = first
+                while True:
+                    row.append(self.column[node] - 1)
+                    node = self.right[node]
+                    if node == first:
+                        break
+            rows.append(row)
+        return rows
+
+    # Main DLX function: the same iterative search as FourWayLinkedList.search_scan, on the integer links
+    # As in dlx_links, the column choice and cover/uncover are written out inline. The search dances on copies of the
+    # links, so closing the generator early leaves the arrays untouched and nothing needs to be restored.
+    # Arguments: logger = the StepLogger of the run, or None
+    # Return: generator, yielding None for each solution
+    def search_scan(self, logger=None):
+        log_branch, log_backtrack = log_hooks(logger)
+        left, right, up, down, column, size = self.search_links()
+        primary = self.primary
+        solution = self.solution_list
+        del solution[self.prefix_length:]  # Rows chosen by select_rows stay in the solution
+        columns = []    # The column chosen as best at each depth
+        deadline = self.deadline
+        while True:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeBudgetExceeded()  # Only between nodes, never halfway through a cover
+            node = -1
+            if not primary[right[0]]:
+                yield None
+            else:
+                # One pass over the header ring: check for dead constraints and find the best column together
+                c = right[0]
+                best = c
+                best_size = size[c]
+                while c != 0:
+                    if primary[c]:
+                        s = size[c]
+                        if s <= 0:
+                            if log_backtrack is not None:
+                                log_backtrack(c - 1)
+                            best = -1
+                            break
+                        if s < best_size:
+                            best, best_size = c, s
+                    c = right[c]
+                if best != -1:
+                    # Cover the best column
+                    right[left[best]] = right[best]
+                    left[right[best]] = left[best]
+                    i = down[best]
+                    while i != best:
+                        j = right[i]
+                        while j != i:
+                            up[down[j]] = up[j]
+                            down[up[j]] = down[j]
+                            size[column[j]] -= 1
+                            j = right[j]
+                        i = down[i]
+                    columns.append(best)
+                    node = best     # Stepped down below, as if returning from the row above the first
+            # Step down to the next row of the deepest column, backtracking while a column has no rows left
+            while columns:
+                if node == -1:
+                    node = solution.pop()
+                    # Uncover the other columns of this row, right to left
+                    r = left[node]
+                    while r != node:
+                        c = column[r]
+                        i = up[c]
+                        while i != c:
+                            j = left[i]
+                            while j != i:
+                                size[column[j]] += 1
+                                up[down[j]] = j
+                                down[up[j]] = j
+                                j = left[j]
+                            i = up[i]
+                        right[left[c]] = c
+                        left[right[c]] = c
+                        r = left[r]
+                node = down[node]
+                if node != columns[-1]:
+                    break
+                # Every row of this column has been tried, uncover it
+                best = columns.pop()
+                i = up[best]
+                while i != best:
+                    j = left[i]
+                    while j != i:
+                        size[column[j]] += 1
+                        up[down[j]] = j
+                        down[up[j]] = j
+                        j = left[j]
+                    i = up[i]
+                right[left[best]] = best
+                left[right[best]] = best
+                node = -1
+            if not columns:
+                return None     # The whole tree has been explored
+            # Add this row to the solution and cover its other columns, before going a level deeper
+            solution.append(node)
+            if log_branch is not None:
+                log_branch(self.row[node], len(solution) - 1)
+            r = right[node]
+            while r != node:
+                c = column[r]
+                right[left[c]] = right[c]
+                left[right[c]] = left[c]
+                i = down[c]
+                while i != c:
+                    j = right[i]
+                    while j != i:
+                        up[down[j]] = up[j]
+                        down[up[j]] = down[j]
+                        size[column[j]] -= 1
+                        j = right[j]
+                    i = down[i]
+                r = right[r]
+
+    # Main DLX function: the same instrumented search as FourWayLinkedList.search_instrumented, on the integer links
+    # Unlike search_scan this dances on the arrays themselves, so the open levels are undone if it is stopped early.
+    # Arguments: logger = the StepLogger of the run, or None, stats = the SearchStats to count into
+    # Return: generator, yielding None for each solution
+    def search_instrumented(self, logger, stats):
+        log_branch, log_backtrack = log_hooks(logger)
+        left, right, down, size, primary = self.left, self.right, self.down, self.size, self.primary
+        solution = self.solution_list
+        del solution[self.prefix_length:]  # Rows chosen by select_rows stay in the solution
+        columns = []    # The column chosen as best at each depth
+        buckets = self.size_buckets(right, size) if self.column_selection == "size_buckets" else None
+        if buckets is None:
+            cover, uncover = self.cover_column, self.uncover_column
+        else:
+            links = (left, right, self.up, down, self.column, size)
+            cover = lambda c: self.cover_column_buckets(c, buckets, links)
+            uncover = lambda c: self.uncover_column_buckets(c, buckets, links)
+        stats.start()
+        deadline = self.deadline
+        try:
+            while True:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeBudgetExceeded()  # Only between nodes, never halfway through a cover
+                node = -1
+                stats.enter(len(solution))
+                if not primary[right[0]]:
+                    stats.solutions += 1
+                    stats.stop()
+                    yield None
+                    stats.start()
+                else:
+                    if buckets is None:
+                        c = right[0]
+                        best = c
+                        while c != 0:
+                            if primary[c]:
+                                if size[c] <= 0:
+                                    dead, best = c, -1
+                                    break
+                                if size[c] < size[best]:
+                                    best = c
+                            c = right[c]
+                    else:
+                        # The first column of the lowest non-empty bucket, see search_size_buckets
+                        s = 0
+                        while not buckets[s]:
+                            s += 1
+                        if s == 0:
+                            dead, best = next(iter(buckets[0])), -1
+                        else:
+                            best = next(iter(buckets[s]))
+                    if best == -1:
+                        stats.backtracks += 1
+                        if log_backtrack is not None:
+                            log_backtrack(dead - 1)
+                    else:
+                        stats.updates += cover(best)
+                        if down[best] != best:
+                            columns.append(best)
+                            node = down[best]
+                        else:
+                            uncover(best)
+                # Backtrack until some depth has another row left to try
+                while node == -1 and columns:
+                    node = solution.pop()
+                    j = left[node]
+                    while j != node:
+                        uncover(self.column[j])
+                        j = left[j]
+                    node = down[node]
+                    if node == columns[-1]:
+                        uncover(columns.pop())
+                        node = -1
+                if node == -1:
+                    return None
+                # Add this row to the solution and cover its other columns, before going a level deeper
+                stats.branches[len(solution)] += 1
+                solution.append(node)
+                if log_branch is not None:
+                    log_branch(self.row[node], len(solution) - 1)
+                j = right[node]
+                while j != node:
+                    stats.updates += cover(self.column[j])
+                    j = right[j]
+        finally:
+            # If the search was stopped early, undo every open level, deepest first
+            while columns:
+                if len(solution) - self.prefix_length == len(columns):
+                    node = solution.pop()
+                    j = left[node]
+                    while j != node:
+                        self.uncover_column(self.column[j])
+                        j = left[j]
+                self.uncover_column(columns.pop())
+            stats.stop()
+
+    # DLX helper function: The size buckets of the uncovered primary columns, see FourWayLinkedList.size_buckets
+    # Arguments: right/size = the right links and column sizes, the arrays themselves or their copies (search_links)
+    # Return: list of dictionaries, buckets[s] holding the indices of the column headers of size s
+    def size_buckets(self, right, size):
+        primary = self.primary
+        primaries = []
+        c = right[0]
+        while c != 0:
+            if primary[c]:
+                primaries.append(c)
+            c = right[c]
+        buckets = [{} for _ in range(max([size[c] for c in primaries], default=0) + 1)]
+        for c in primaries:
+            buckets[size[c]][c] = None
+        return buckets
+
+    # DLX helper function: cover_column, also moving the columns between their buckets, see
+    # FourWayLinkedList.cover_column_buckets. Shared by search_size_buckets, which dances on the copies made by
+    # search_links, and search_instrumented, which dances on the arrays.
+    # Arguments: c = the index of the column header to be covered, buckets = see size_buckets
+    # links = the left, right, up, down, column and size links to dance on
+    # Return: updates = the number of nodes unlinked from their columns
+    def cover_column_buckets(self, c, buckets, links):
+        left, right, up, down, column, size = links
+        primary = self.primary
+        right[left[c]] = right[c]
+        left[right[c]] = left[c]
+        if primary[c]:
+            del buckets[size[c]][c]
+        updates = 0
+        i = down[c]
+        while i != c:
+            j = right[i]
+            while j != i:
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                d = column[j]
+                s = size[d]
+                size[d] = s - 1
+                if primary[d]:
+                    del buckets[s][d]
+                    buckets[s - 1][d] = None
+                updates += 1
+                j = right[j]
+            i = down[i]
+        return updates
+
+    # DLX helper function: uncover_column, returning the columns to their buckets, see
+    # FourWayLinkedList.uncover_column_buckets
+    # Arguments: c = the index of the column header to be uncovered, buckets/links = see cover_column_buckets
+    # Return: None
+    def uncover_column_buckets(self, c, buckets, links):
+        left, right, up, down, column, size = links
+        primary = self.primary
+        i = up[c]
+        while i != c:
+            j = left[i]
+            while j != i:
+                d = column[j]
+                s = size[d]
+                size[d] = s + 1
+                if primary[d]:
+                    del buckets[s][d]
+                    buckets[s + 1][d] = None
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[c]] = c
+        left[right[c]] = c
+        if primary[c]:
+            buckets[size[c]][c] = None
+        return None
+
+    # Main DLX function: the same search as FourWayLinkedList.search_size_buckets, on the integer links
+    # buckets[s] holds every uncovered primary column of size s, the best column is the first column of the lowest
+    # non-empty bucket and a dead constraint is a column in buckets[0]. As search_scan it dances on the copies made by
+    # search_links, so closing the generator early leaves the arrays untouched.
+    # Arguments: logger = the StepLogger of the run, or None, depth = see FourWayLinkedList.search_size_buckets
+    # Return: generator, yielding None for each solution
+    def search_size_buckets(self, logger=None, depth=None):
+        log_branch, log_backtrack = log_hooks(logger)
+        links = self.search_links()
+        left, right, down, column = links[0], links[1], links[3], links[4]
+        cover, uncover = self.cover_column_buckets, self.uncover_column_buckets
+        solution = self.solution_list
+        del solution[self.prefix_length:]  # Rows chosen by select_rows stay in the solution
+        columns = []    # The column chosen as best at each depth
+        buckets = self.size_buckets(right, links[5])
+        n_buckets = len(buckets)
+        deadline = self.deadline
+        while True:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeBudgetExceeded()  # Only between nodes, never halfway through a cover
+            node = -1
+            s = 0
+            while s < n_buckets and not buckets[s]:
+                s += 1
+            if s == n_buckets or len(columns) == depth:
+                yield None
+            elif s == 0:
+                if log_backtrack is not None:
+                    log_backtrack(next(iter(buckets[0])) - 1)
+            else:
+                best = next(iter(buckets[s]))
+                cover(best, buckets, links)
+                columns.append(best)
+                node = down[best]
+            # Backtrack until some depth has another row left to try
+            while node == -1 and columns:
+                node = solution.pop()
+                j = left[node]
+                while j != node:
+                    uncover(column[j], buckets, links)
+                    j = left[j]
+                node = down[node]
+                if node == columns[-1]:
+                    uncover(columns.pop(), buckets, links)
+                    node = -1
+            if node == -1:
+                return None     # The whole tree has been explored
+            # Add this row to the solution and cover its other columns, before going a level deeper
+            solution.append(node)
+            if log_branch is not None:
+                log_branch(self.row[node], len(solution) - 1)
+            j = right[node]
+            while j != node:
+                cover(column[j], buckets, links)
+                j = right[j]
+
+    # Main DLX function: The cached search with its own stack of open levels, see FourWayLinkedList.memo_search
+    # As in search_scan the links are copied first, and covering is written out inline. Bit c - 1 of the mask stands
+    # for column header c.
+    # Arguments: cache = the CountCache to use, join = the function folding the rows' values
+    # Return: the value of the rows already chosen (if any, see select_rows)
+    def memo_search(self, cache, join):
+        left, right, up, down, column, size = self.search_links()
+        primary, row = self.primary, self.row
+
+        def cover(c):
+            right[left[c]] = right[c]
+            left[right[c]] = left[c]
+            i = down[c]
+            while i != c:
+                j = right[i]
+                while j != i:
+                    up[down[j]] = up[j]
+                    down[up[j]] = down[j]
+                    size[column[j]] -= 1
+                    j = right[j]
+                i = down[i]
+
+        def uncover(c):
+            i = up[c]
+            while i != c:
+                j = left[i]
+                while j != i:
+                    size[column[j]] += 1
+                    up[down[j]] = j
+                    down[up[j]] = j
+                    j = left[j]
+                i = up[i]
+            right[left[c]] = c
+            left[right[c]] = c
+
+        deadline = self.deadline
+        mask = 0
+        c = right[0]
+        while c != 0:
+            mask = mask | (1 << (c - 1))
+            c = right[c]
+        stack = []  # For each open level: [its mask, its best column, the row searched below it, its value so far]
+        while True:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeBudgetExceeded()
+            # The value of this set of uncovered columns, unless it has to be searched in a new level
+            value = cache.get(mask)
+            if value is None:
+                if not primary[right[0]]:   # Only non-primary columns are left, a solution
+                    value = 1
+                else:
+                    # One pass over the header ring: check for dead constraints and find the best column together
+                    c = right[0]
+                    best = c
+                    while c != 0:
+                        if primary[c]:
+                            if size[c] <= 0:
+                                best = -1
+                                break
+                            if size[c] < size[best]:
+                                best = c
+                        c = right[c]
+                    if best == -1:
+                        value = 0
+                    else:
+                        cover(best)
+                        stack.append([mask, best, best, 0])
+                if value is not None:
+                    cache.put(mask, value)
+            # Fold the value into the level above, closing levels until one has another row left to search
+            while True:
+                if not stack:
+                    return value
+                level = stack[-1]
+                mask, best, node = level[0], level[1], level[2]
+                if value is not None:
+                    r = left[node]
+                    while r != node:
+                        uncover(column[r])
+                        r = left[r]
+                    level[3] = join(level[3], row[node], value)
+                node = down[node]
+                if node != best:
+                    break
+                uncover(best)
+                stack.pop()
+                value = level[3]
+                cache.put(mask, value)
+            # Cover the columns of the next row, then search the set of columns it leaves
+            mask = mask ^ (1 << (best - 1))
+            r = right[node]
+            while r != node:
+                cover(column[r])
+                mask = mask ^ (1 << (column[r] - 1))
+                r = right[r]
+            level[2] = node
@@ -0,0 +1,252 @@
+# Imports
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import main
+import parallel_dlx
+from n_queen_bitboard import n_queen_bitboard_count
+import problems
+from search_stats import SearchStats
+
+
+# Benchmark function: Times a single N-Queens run of DLX for a given engine
+# The solutions are only counted, so no output files are written and only the search itself is timed.
+# Arguments: engine = see main.create_linked_list, n = size of board
+# Return: dictionary holding the build time, search time, number of solutions found and the engine used
+def time_n_queen(engine, n):
+    rows = list(main.n_queen_rows(n))
+    overall_list = main.create_linked_list(engine, rows=rows, n_columns=main.n_queen_column_count(n), n_primary=2 * n)
+    start_time = time.perf_counter()
+    overall_list.build_from_rows(rows, main.n_queen_column_count(n))
+    overall_list.transform_n_queen(n, write_file=False)
+    build_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    overall_list.count_solutions()
+    search_time = time.perf_counter() - start_time
+    return {"build": build_time, "search": search_time, "solutions": overall_list.total_solutions,
+            "engine": overall_list.engine}
+
+
+# Benchmark function: Measures the memory held by the list object for every 1 in the N-Queens matrix
+# Arguments: engine = 'object' or 'array', n = size of board
+# Return: bytes per 1-entry
+def bytes_per_entry(engine, n):
+    rows = list(main.n_queen_rows(n))
+    overall_list = main.create_linked_list(engine)
+    tracemalloc.start()
+    overall_list.build_from_rows(rows, main.n_queen_column_count(n))
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held / sum(len(row) for row in rows)
+
+
+# Benchmark function: Compares the object and array engines on the N-Queens problem, printing a small table
+# Arguments: n_values = the board sizes to run, memory_n = the board size used for the memory measurement
+# Return: results = dictionary of the timings, keyed by (engine, n)
+def benchmark_engines(n_values=range(10, 14), memory_n=30):
+    results = {}
+    print("Bytes per 1-entry (N = {0}):".format(memory_n))
+    for engine in ("object", "array"):
+        print("\t{0}: {1:.1f}".format(engine, bytes_per_entry(engine, memory_n)))
+    print("N\tsolutions\tobject (s)\tarray (s)\tspeedup")
+    for n in n_values:
+        for engine in ("object", "array"):
+            results[(engine, n)] = time_n_queen(engine, n)
+        object_time = results[("object", n)]["search"]
+        array_time = results[("array", n)]["search"]
+        if results[("object", n)]["solutions"] != results[("array", n)]["solutions"]:
+            print("Warning: the engines disagree on the number of solutions for N =", n)
+        print("{0}\t{1}\t\t{2:.3f}\t\t{3:.3f}\t\t{4:.2f}x".format(n, results[("array", n)]["solutions"],
+                                                                 object_time, array_time, object_time / array_time))
+    return results
+
+
+# Benchmark function: Compares counting the N-Queens solutions with DLX and with the bitboard search, printing a table
+# Arguments: n_values = the board sizes to run, engine = the DLX engine, see main.create_linked_list. 'auto' is the
+# default of main.py, so the speedup is against the engine a run would use.
+# Return: results = dictionary of the search times, keyed by ('dlx' or 'bitboard', n)
+def benchmark_bitboard(n_values=range(10, 14), engine="auto"):
+    results = {}
+    print("N\tsolutions\tengine\tdlx (s)\tbitboard (s)\tspeedup")
+    for n in n_values:
+        dlx = time_n_queen(engine, n)
+        start_time = time.perf_counter()
+        total = n_queen_bitboard_count(n)
+        results[("dlx", n)], results[("bitboard", n)] = dlx["search"], time.perf_counter() - start_time
+        if total != dlx["solutions"]:
+            print("Warning: the searches disagree on the number of solutions for N =", n)
+        print("{0}\t{1}\t\t{2}\t{3:.3f}\t{4:.3f}\t\t{5:.1f}x".format(n, total, dlx["engine"], results[("dlx", n)],
+                                                                     results[("bitboard", n)],
+                                                                     results[("dlx", n)] / results[("bitboard", n)]))
+    return results
+
+
+# The engine and column selection combinations run by the suite
+SUITE_MODES = [("object", "scan"), ("object", "size_buckets"), ("array", "scan"), ("array", "size_buckets"),
+               ("bitset", "scan")]
+
+
+# Suite function: The problems of the benchmark suite, every one of them built offline
+# Each case is a parallel_dlx problem dictionary, with a "name", a "family" and the "expected" number of solutions
+# (None when it is not known in advance, e.g. for the random matrices).
+# Arguments: max_n = the largest N-Queens board, quick = if True only the faster cases are kept
+# Return: list of case dictionaries
+def suite_cases(max_n=14, quick=False):
+    cases = []
+    for n in range(4, max_n + 1):
+        case = parallel_dlx.n_queen_problem(n)
+        case.update({"name": "n-queens-{0}".format(n), "family": "n-queens", "expected": main.N_QUEEN_TOTALS[n]})
+        cases.append(case)
+    for name, puzzle in problems.SUDOKU_PUZZLES.items():
+        case = problems.sudoku_problem(puzzle)
+        case.update({"name": "sudoku-{0}".format(name), "family": "sudoku", "expected": 1})
+        cases.append(case)
+    for height, width, expected in ((3, 20, 8), (4, 15, 1472)):
+        if quick and expected > 8:
+            continue
+        case = problems.pentomino_problem(height, width)
+        case.update({"name": "pentomino-{0}x{1}".format(height, width), "family": "tiling", "expected": expected})
+        cases.append(case)
+    for n_rows, n_columns, density in ((200, 40, 0.15), (300, 50, 0.12)):
+        for seed in range(2):
+            case = problems.random_problem(n_rows, n_columns, density, seed)
+            case.update({"name": "random-{0}x{1}-seed{2}".format(n_rows, n_columns, seed), "family": "random",
+                         "expected": None})
+            cases.append(case)
+    return cases
+
+
+# Suite function: Runs a single case with a single engine and column selection
+# The count is timed on its own, with no tracing or counters. The peak memory is then traced over a fresh build and
+# the search up to its first solution, which covers the links and any copies the search makes of them. Finally the
+# nodes and updates come from an instrumented search (see search_stats.py), which chooses its columns by the same
+# column_selection, so they are the counts of the search that was timed.
+# Arguments: case = case dictionary, engine/column_selection = see parallel_dlx.build_list
+# count_nodes = if False the instrumented search is skipped
+# Return: result dictionary
+def run_case(case, engine, column_selection, count_nodes=True):
+    start_time = time.perf_counter()
+    overall_list = parallel_dlx.build_list(case, engine, column_selection)
+    build_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    solutions = overall_list.count_solutions()
+    search_time = time.perf_counter() - start_time
+    tracemalloc.start()
+    traced_list = parallel_dlx.build_list(case, engine, column_selection)
+    next(traced_list.iter_solutions(limit=1), None)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {"case": case["name"], "family": case["family"], "engine": engine, "column_selection": column_selection,
+              "solutions": solutions, "expected": case["expected"],
+              "correct": case["expected"] is None or solutions == case["expected"],
+              "build_time": build_time, "time": search_time, "peak_memory": peak_memory, "nodes": None,
+              "updates": None}
+    if count_nodes:
+        traced_list.stats = SearchStats()
+        traced_list.count_solutions()
+        result["nodes"] = traced_list.stats.report()["nodes"]
+        result["updates"] = traced_list.stats.updates
+    return result
+
+
+# Suite function: Runs every case in every mode, printing a line per run
+# Arguments: cases = list of case dictionaries (default suite_cases()), modes = list of (engine, column_selection)
+# count_nodes = see run_case
+# Return: dictionary of the machine details and the list of results, ready for JSON
+def run_suite(cases=None, modes=SUITE_MODES, count_nodes=True):
+    if cases is None:
+        cases = suite_cases()
+    results = []
+    print("case\tengine\tselection\tsolutions\ttime (s)\tpeak (KiB)\tnodes")
+    for case in cases:
+        for engine, column_selection in modes:
+            result = run_case(case, engine, column_selection, count_nodes)
+            results.append(result)
+            print("{0}\t{1}\t{2}\t{3}{4}\t{5:.3f}\t{6:.0f}\t{7}".format(
+                result["case"], engine, column_selection, result["solutions"], "" if result["correct"] else " WRONG",
+                result["time"], result["peak_memory"] / 1024, result["nodes"]))
+    return {"python": sys.version.split()[0], "platform": platform.platform(), "cpus": os.cpu_count(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}
+
+
+# Suite function: Compares a suite run against a stored baseline run
+# Wrong or changed counts and changed node counts are always flagged. Time and memory are flagged once they grow by
+# more than the tolerance, times under min_time seconds are too noisy to compare.
+# Arguments: run/baseline = dictionaries returned by run_suite, tolerance = allowed relative growth
+# min_time = the smallest time compared
+# Return: list of messages, one per regression
+def find_regressions(run, baseline, tolerance=0.2, min_time=0.05):
+    previous = {(r["case"], r["engine"], r["column_selection"]): r for r in baseline["results"]}
+    messages = []
+    for result in run["results"]:
+        key = (result["case"], result["engine"], result["column_selection"])
+        label = "{0} ({1}, {2})".format(*key)
+        if not result["correct"]:
+            messages.append("{0}: {1} solutions, expected {2}".format(label, result["solutions"], result["expected"]))
+        if key not in previous:
+            continue
+        old = previous[key]
+        if result["solutions"] != old["solutions"]:
+            messages.append("{0}: {1} solutions, baseline {2}".format(label, result["solutions"], old["solutions"]))
+        if result["nodes"] is not None and old["nodes"] is not None and result["nodes"] != old["nodes"]:
+            messages.append("{0}: {1} nodes, baseline {2}".format(label, result["nodes"], old["nodes"]))
+        if max(result["time"], old["time"]) >= min_time and result["time"] > old["time"] * (1 + tolerance):
+            messages.append("{0}: {1:.3f}s, baseline {2:.3f}s".format(label, result["time"], old["time"]))
+        if result["peak_memory"] > old["peak_memory"] * (1 + tolerance):
+            messages.append("{0}: peak memory {1} bytes, baseline {2}".format(label, result["peak_memory"],
+                                                                            old["peak_memory"]))
+    return messages
+
+
+# Suite function: The command line of the suite, see the usage below
+# Arguments: arguments = the parsed command line
+# Return: exit status, 1 if a regression or wrong count was found
+def suite_main(arguments):
+    cases = suite_cases(arguments.max_n, arguments.quick)
+    modes = [mode for mode in SUITE_MODES if arguments.engine in (None, mode[0])]
+    run = run_suite(cases, modes, not arguments.no_nodes)
+    with open(arguments.output, "w") as file:
+        json.dump(run, file, indent=2)
+    print("Results written to '{0}'".format(arguments.output))
+    if arguments.save_baseline:
+        with open(arguments.baseline, "w") as file:
+            json.dump(run, file, indent=2)
+        print("Baseline saved to '{0}'".format(arguments.baseline))
+        messages = find_regressions(run, {"results": []})
+    elif os.path.exists(arguments.baseline):
+        with open(arguments.baseline) as file:
+            messages = find_regressions(run, json.load(file), arguments.tolerance)
+    else:
+        print("No baseline at '{0}', run with --save-baseline to store one".format(arguments.baseline))
+        messages = find_regressions(run, {"results": []})
+    for message in messages:
+        print("REGRESSION:", message)
+    return 1 if messages else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for DLX. With no command the engines are compared on "
+                                                 "N-Queens.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("engines", help="compare the object and array engines on N-Queens")
+    commands.add_parser("bitboard", help="compare DLX with the bitboard N-Queens search")
+    suite_parser = commands.add_parser("suite", help="run the regression suite")
+    suite_parser.add_argument("--output", default="benchmark_results.json", help="file to write the results to")
+    suite_parser.add_argument("--baseline", default="benchmark_baseline.json", help="stored run to compare against")
+    suite_parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    suite_parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slow down")
+    suite_parser.add_argument("--max-n", type=int, default=14, help="largest N-Queens board")
+    suite_parser.add_argument("--quick", action="store_true", help="skip the slowest cases")
+    suite_parser.add_argument("--engine", choices=["object", "array", "bitset"], help="run a single engine")
+    suite_parser.add_argument("--no-nodes", action="store_true", help="skip the instrumented search")
+    arguments = parser.parse_args()
+    if arguments.command == "suite":
+        sys.exit(suite_main(arguments))
+    if arguments.command == "bitboard":
+        benchmark_bitboard()
+    else:
+        benchmark_engines()
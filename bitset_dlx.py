@@ -0,0 +1,142 @@
+# Imports
+import time
+from main import FourWayLinkedList
+from time_budget import TimeBudgetExceeded
+from step_logger import log_hooks
+
+# Least cover work per primary column for which engine 'auto' picks the bitset engine, see main.choose_engine.
+# Each node of the bitset search makes a pass over the uncovered primary columns with a mask operation each, where a
+# linked search spends about (mean row length) x (mean column size) link updates on every cover. Measured with
+# count_solutions against the array engine, by that product over the number of primary columns: well above 1 the
+# bitset engine is faster (N-Queens, 1.45: 2.3 times, random 40 columns, 4.2: 3 times, pentominoes 3x20, 8.6: 8.5
+# times), well below it slower (Sudoku, 0.09: 3 times, domino tilings, 0.2: 1.35 times, random 200 columns, 0.47: 1.5
+# times). Between about 0.7 and 1.5 the two engines are within 1.5 times of each other, either way.
+BITSET_MIN_COVER_RATIO = 1
+
+
+# Class declaration for the bitset list object.
+# Algorithm X on Python integers used as bit masks, for matrices narrow enough that a whole column or row is a handful
+# of machine words. Bit i of a row set stands for matrix row i, bit j of a column set for column j:
+#   column_rows[j] = the rows with a 1 in column j
+#   row_columns[i] = the columns of row i
+#   row_conflicts[i] = every row sharing a column with row i (including row i), the rows removed by choosing it
+# The state of the search is just two masks, the rows still available and the primary columns still uncovered, so
+# choosing a row is two AND NOTs and undoing it is free: each level keeps its own masks.
+# The linked list of FourWayLinkedList is still built, for the names, files, select_rows and the other searches
+# (dlx, search_instrumented, memo_search). Only the scan search is replaced, and it tries the same
+# columns and rows in the same order as search_scan, so the solutions and log are identical.
+class BitsetLinkedList(FourWayLinkedList):
+    def __init__(self, main_file_name="main_output.txt", log_file_name="log.txt"):
+        super().__init__(main_file_name, log_file_name)
+        self.engine = "bitset"
+        self.column_rows = []
+        self.row_columns = []
+        self.row_conflicts = []
+
+    # Core function: Links the list as FourWayLinkedList.build_from_rows, then makes the masks from its rows
+    # Arguments: rows = iterable of column index lists, one per row of the matrix
+    # n_columns = the number of columns of the matrix
+    # Return: master_node = the master node of the list object
+    def build_from_rows(self, rows, n_columns):
+        master_node = super().build_from_rows(rows, n_columns)
+        column_rows = [0] * n_columns
+        row_columns = []
+        for i, row in enumerate(self.matrix_rows()):
+            bit = 1 << i
+            mask = 0
+            for j in row:
+                column_rows[j] = column_rows[j] | bit
+                mask = mask | (1 << j)
+            row_columns.append(mask)
+        row_conflicts = []
+        for i, row in enumerate(self.matrix_rows()):
+            mask = 0
+            for j in row:
+                mask = mask | column_rows[j]
+            row_conflicts.append(mask)
+        self.column_rows, self.row_columns, self.row_conflicts = column_rows, row_columns, row_conflicts
+        return master_node
+
+    # Main DLX function: Searches with the bitset search, see FourWayLinkedList.search
+    # The masks have no column sizes to keep in buckets, so column_selection 'size_buckets' is refused, use the array
+    # engine for it. The instrumented search is the linked one, as its counters are those of the links.
+    # Arguments: log = boolean value or log level, see step_logging
+    # Return: generator, yielding None for each solution
+    def search(self, log=True):
+        if self.column_selection == "size_buckets":
+            raise ValueError("The bitset engine has no size_buckets search, use the array engine")
+        with self.step_logging(log) as logger:
+            if self.stats is not None:
+                yield from self.search_instrumented(logger, self.stats)
+            else:
+                yield from self.search_bitset(logger)
+        return None
+
+    # Main DLX function: Algorithm X on the masks, without recursion, written as a generator like search_scan.
+    # The best column is the first uncovered primary column with the fewest available rows, its rows are tried from
+    # the top (lowest row index) down, exactly as search_scan would.
+    # Rows chosen by select_rows stay in the solution and are taken as already chosen.
+    # Arguments: logger = the StepLogger of the run, or None
+    # Return: generator, yielding None for each solution
+    def search_bitset(self, logger=None):
+        log_branch, log_backtrack = log_hooks(logger)
+        column_rows, row_columns, row_conflicts = self.column_rows, self.row_columns, self.row_conflicts
+        row_nodes = self.row_nodes
+        solution = self.solution_list
+        prefix = self.prefix_length
+        del solution[prefix:]
+        active = (1 << len(row_nodes)) - 1     # Rows still available
+        uncovered = 0   # Primary columns still uncovered
+        for j, column in enumerate(self.column_headers):
+            if column.primary:
+                uncovered = uncovered | (1 << j)
+        for node in solution:
+            if not (active >> node.row) & 1:
+                return None     # Chosen rows that overlap, nothing can complete them
+            active = active & ~row_conflicts[node.row]
+            uncovered = uncovered & ~row_columns[node.row]
+        stack = []  # For each depth: [rows left to try, available rows, uncovered primary columns]
+        deadline = self.deadline
+        while True:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeBudgetExceeded()  # Only between nodes, never halfway through a cover
+            candidates = 0
+            if uncovered == 0:
+                yield None
+            else:
+                # One pass over the uncovered primary columns, lowest first: find the best column, or a dead one
+                best_size = -1
+                columns = uncovered
+                while columns:
+                    low = columns & -columns
+                    j = low.bit_length() - 1
+                    rows = column_rows[j] & active
+                    if rows == 0:
+                        if log_backtrack is not None:
+                            log_backtrack(j)
+                        candidates = 0
+                        break
+                    size = rows.bit_count()
+                    if best_size == -1 or size < best_size:
+                        candidates, best_size = rows, size
+                    columns = columns ^ low
+            stack.append([candidates, active, uncovered])
+            # Take the next row of the deepest column, backtracking while a column has no rows left
+            while stack:
+                level = stack[-1]
+                if len(solution) > prefix + len(stack) - 1:
+                    solution.pop()  # The row tried last at this depth
+                if level[0] == 0:
+                    stack.pop()
+                    continue
+                low = level[0] & -level[0]
+                level[0] = level[0] ^ low
+                i = low.bit_length() - 1
+                solution.append(row_nodes[i])
+                if log_branch is not None:
+                    log_branch(i, len(solution) - 1)
+                active = level[1] & ~row_conflicts[i]
+                uncovered = level[2] & ~row_columns[i]
+                break
+            else:
+                return None     # The whole tree has been explored
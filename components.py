@@ -0,0 +1,136 @@
+# Imports
+import functools
+import itertools
+import multiprocessing
+import parallel_dlx
+
+# Decomposition of an exact cover problem into independent components.
+# Two rows are in the same component when they share a column, directly or through other rows. Rows of different
+# components never conflict, so every solution of the whole problem is one solution of each component, and the number
+# of solutions is the product of the counts of the components. Searching the components one at a time replaces a
+# search tree whose size is the product of theirs by one whose size is the sum.
+# A primary column with no rows is a component of its own with no solutions. Rows covering no columns, and secondary
+# columns with no rows, belong to no component as they never change the solutions.
+
+
+# Helper function: The root of a column in the union-find forest of find_components, with path halving
+# Arguments: parent = list of parent columns, column = the column
+# Return: the root column
+def find_root(parent, column):
+    while parent[column] != column:
+        parent[column] = parent[parent[column]]
+        column = parent[column]
+    return column
+
+
+# Main decomposition function: Splits a problem into its independent components
+# Arguments: problem = problem dictionary, see parallel_dlx. Its "n_primary" and "names" keys are used if given.
+# Return: list of (component problem dictionary, row_map) pairs, in the order of their first column, where
+# row_map[i] = the row of the problem that is row i of the component. The columns of a component keep their order
+# and names, so primary columns stay first.
+def find_components(problem):
+    n_columns = problem["n_columns"]
+    n_primary = problem.get("n_primary")
+    if n_primary is None:
+        n_primary = n_columns
+    names = problem.get("names")
+    if names is None:
+        names = ["Constraint {0}".format(j) for j in range(n_columns)]
+    parent = list(range(n_columns))
+    for row in problem["rows"]:
+        for j in row[1:]:
+            a, b = find_root(parent, row[0]), find_root(parent, j)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+    # Group the columns and rows by their root
+    columns, rows, row_maps = {}, {}, {}
+    for j in range(n_columns):
+        columns.setdefault(find_root(parent, j), []).append(j)
+    for i, row in enumerate(problem["rows"]):
+        if row:
+            root = find_root(parent, row[0])
+            rows.setdefault(root, []).append(row)
+            row_maps.setdefault(root, []).append(i)
+    components = []
+    for root in sorted(columns):
+        if root not in rows and columns[root][0] >= n_primary:
+            continue    # Secondary columns with no rows
+        new_column = {j: k for k, j in enumerate(columns[root])}
+        component = {"rows": [[new_column[j] for j in row] for row in rows.get(root, [])],
+                     "n_columns": len(columns[root]), "n_primary": sum(j < n_primary for j in columns[root]),
+                     "names": [names[j] for j in columns[root]]}
+        components.append((component, row_maps.get(root, [])))
+    return components
+
+
+# Helper function: Describes the matrix held by a list object as a problem dictionary, with its column names and
+# number of primary columns. Must be called while no columns are covered.
+# Arguments: overall_list = the list object
+# Return: problem dictionary
+def list_problem(overall_list):
+    return {"rows": overall_list.matrix_rows(), "n_columns": overall_list.column_count(),
+            "n_primary": overall_list.primary_column_count(), "names": list(overall_list.header_list)}
+
+
+# Worker function: Counts the solutions of a single component
+# Arguments: problem = problem dictionary, engine/column_selection = see parallel_dlx.build_list
+# deadline = (optional) the time.monotonic() at which the search raises TimeBudgetExceeded, see time_budget.py
+# Return: number of solutions
+def count_problem(problem, engine="array", column_selection="scan", deadline=None):
+    overall_list = parallel_dlx.build_list(problem, engine, column_selection)
+    overall_list.deadline = deadline
+    return overall_list.count_solutions()
+
+
+# Main decomposition function: Counts the solutions of a problem as the product of the counts of its components.
+# The smallest components are counted first, so a component with no solutions ends the count early. With several
+# workers the counts are taken as they finish, and a count of 0 or a search out of time ends the pool at once, stopping
+# the components still running as well as those not yet started.
+# Arguments: problem = problem dictionary, engine/column_selection = see parallel_dlx.build_list
+# workers = number of processes counting components at once, 1 counts them in this process, deadline = see count_problem
+# Return: total number of solutions
+def component_count(problem, engine="array", column_selection="scan", workers=1, deadline=None):
+    components = sorted((component for component, _ in find_components(problem)), key=lambda c: len(c["rows"]))
+    if workers == 1:
+        total = 1
+        for component in components:
+            total = total * count_problem(component, engine, column_selection, deadline)
+            if total == 0:
+                break
+        return total
+    count = functools.partial(count_problem, engine=engine, column_selection=column_selection, deadline=deadline)
+    with multiprocessing.Pool(workers) as pool:     # Leaving the block terminates the workers, even mid-count
+        total = 1
+        for component_total in pool.imap_unordered(count, components):
+            total = total * component_total
+            if total == 0:
+                break
+        return total
+
+
+# Main decomposition function: Lazily yields the solutions of a problem, as the Cartesian product of the solutions of
+# its components. The first component is searched as the solutions are taken, the solutions of the others are found
+# (once) before the first solution is yielded, so the whole product is never held.
+# Arguments: problem = problem dictionary, engine/column_selection = see parallel_dlx.build_list
+# deadline = see count_problem
+# Return: generator of solutions, each a sorted list of row indices of the problem
+def component_solutions(problem, engine="array", column_selection="scan", deadline=None):
+    components = find_components(problem)
+    if not components:
+        yield []    # Nothing to cover, the empty solution
+        return None
+    others = []
+    for component, row_map in components[1:]:
+        overall_list = parallel_dlx.build_list(component, engine, column_selection)
+        overall_list.deadline = deadline
+        others.append([[row_map[i] for i in rows] for rows in overall_list.iter_solutions()])
+        if not others[-1]:
+            return None
+    first, first_map = components[0]
+    first_list = parallel_dlx.build_list(first, engine, column_selection)
+    first_list.deadline = deadline
+    for rows in first_list.iter_solutions():
+        first_rows = [first_map[i] for i in rows]
+        for choice in itertools.product(*others):
+            yield sorted(itertools.chain(first_rows, *choice))
+    return None
@@ -0,0 +1,221 @@
+# Imports
+import argparse
+import json
+import multiprocessing
+import queue
+import socket
+import threading
+import parallel_dlx
+
+# The coordinator and workers talk over TCP, one JSON message per line:
+#   coordinator -> worker: {"type": "problem", "problem": ..., "engine": ..., "column_selection": ...}
+#   worker -> coordinator: {"type": "ready"}
+#   coordinator -> worker: {"type": "prefix", "id": i, "prefix": [...], "collect": true/false}
+#   worker -> coordinator: {"type": "result", "id": i, "result": count or list of solutions}
+#   coordinator -> worker: {"type": "done"}
+# A worker that fails on a message replies {"type": "error", "message": ...}.
+# The problem dictionaries are those of parallel_dlx.
+
+# Default seconds the coordinator waits for a worker's reply before handing its prefix to another worker
+DEFAULT_TIMEOUT = 300.0
+
+
+# Helper function: Sends a single message
+# Arguments: stream = binary file object of the socket, message = dictionary to send
+# Return: None
+def send_message(stream, message):
+    stream.write(json.dumps(message).encode() + b"\n")
+    stream.flush()
+    return None
+
+
+# Helper function: Receives a single message
+# Arguments: stream = binary file object of the socket
+# Return: the message dictionary
+def receive_message(stream):
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("Connection closed")
+    return json.loads(line)
+
+
+# Worker function: Answers a single coordinator until it sends 'done' or disconnects.
+# A coordinator that disconnects in the middle of a job simply ends the conversation.
+# Arguments: connection = the accepted socket
+# Return: None
+def serve_coordinator(connection):
+    with connection, connection.makefile("rwb") as stream:
+        while True:
+            try:
+                message = receive_message(stream)
+            except ConnectionError:
+                return None
+            try:
+                if message["type"] == "problem":
+                    parallel_dlx.init_worker(message["problem"], message["engine"], message["column_selection"])
+                    send_message(stream, {"type": "ready"})
+                elif message["type"] == "prefix":
+                    result = parallel_dlx.search_prefix(message["prefix"], message["collect"])
+                    send_message(stream, {"type": "result", "id": message["id"], "result": result})
+                elif message["type"] == "done":
+                    return None
+                else:
+                    send_message(stream, {"type": "error", "message": "Unknown message type"})
+            except Exception as error:
+                try:
+                    send_message(stream, {"type": "error", "message": repr(error)})
+                except OSError:
+                    return None     # The coordinator has gone, e.g. the reply above failed for that reason
+
+
+# Main worker function: Listens for coordinators on a TCP port, serving one at a time
+# Arguments: host/port = the address to listen on (port 0 picks a free port)
+# ready = (optional) multiprocessing queue, the chosen port is put on it once listening
+# Return: None, runs until the process is stopped
+def run_worker(host="127.0.0.1", port=0, ready=None):
+    with socket.create_server((host, port)) as server:
+        port = server.getsockname()[1]
+        if ready is not None:
+            ready.put(port)
+        else:
+            print("DLX worker listening on {0}:{1}".format(host, port))
+        while True:
+            connection, _ = server.accept()
+            try:
+                serve_coordinator(connection)
+            except OSError:
+                pass    # Lost while closing the connection, wait for the next coordinator
+
+
+# Helper function: Starts worker processes on free localhost ports, e.g. to test the coordinator on one machine
+# Arguments: count = number of workers, host = the address to listen on
+# Return: (list of worker processes, list of (host, port) addresses)
+def start_local_workers(count, host="127.0.0.1"):
+    ready = multiprocessing.Queue()
+    processes = []
+    for _ in range(count):
+        process = multiprocessing.Process(target=run_worker, args=(host, 0, ready), daemon=True)
+        process.start()
+        processes.append(process)
+    addresses = [(host, ready.get(timeout=30)) for _ in range(count)]
+    return processes, addresses
+
+
+# Coordinator function: Feeds prefixes to a single worker until every prefix has a result.
+# If the worker disconnects or stops answering, the prefix it was working on is returned to the queue for the other
+# workers, and this thread gives up on it.
+# Arguments: address = (host, port) of the worker, setup = the problem message, prefixes = list of all prefixes
+# pending = queue of prefix ids still to be searched, results = dictionary of results by prefix id
+# lock = lock protecting results, collect = see parallel_dlx.search_prefix, timeout = seconds to wait for a reply
+# Return: None
+def feed_worker(address, setup, prefixes, pending, results, lock, collect, timeout):
+    try:
+        connection = socket.create_connection(address, timeout=timeout)
+    except OSError:
+        return None     # Worker unreachable, the others take its share
+    with connection, connection.makefile("rwb") as stream:
+        try:
+            send_message(stream, setup)
+            if receive_message(stream)["type"] != "ready":
+                return None
+        except (OSError, ValueError):
+            return None
+        while True:
+            with lock:
+                if len(results) == len(prefixes):
+                    break
+            try:
+                prefix_id = pending.get(timeout=0.1)    # Another thread may still return a prefix to the queue
+            except queue.Empty:
+                continue
+            try:
+                send_message(stream, {"type": "prefix", "id": prefix_id, "prefix": prefixes[prefix_id],
+                                      "collect": collect})
+                reply = receive_message(stream)
+            except (OSError, ValueError):
+                pending.put(prefix_id)  # Worker lost, reassign this prefix
+                return None
+            if reply["type"] != "result":
+                pending.put(prefix_id)
+                return None
+            with lock:
+                results[prefix_id] = reply["result"]
+        try:
+            send_message(stream, {"type": "done"})
+        except OSError:
+            pass
+    return None
+
+
+# Main coordinator function: Splits a problem into prefixes and searches them on remote workers.
+# Arguments: problem = parallel_dlx problem dictionary, addresses = list of (host, port) worker addresses
+# depth = number of levels to split, engine/column_selection = see parallel_dlx.build_list
+# collect = see parallel_dlx.search_prefix, timeout = seconds to wait for a worker's reply, after which its prefix is
+# handed to another worker (None waits forever, so a hung worker holds its prefix for good)
+# Return: list of the result of each prefix, in prefix order
+def distributed_map(problem, addresses, depth=3, engine="array", column_selection="scan", collect=False,
+                    timeout=DEFAULT_TIMEOUT):
+    prefixes = parallel_dlx.split_prefixes(parallel_dlx.build_list(problem, engine, column_selection), depth)
+    pending = queue.Queue()
+    for prefix_id in range(len(prefixes)):
+        pending.put(prefix_id)
+    results = {}
+    lock = threading.Lock()
+    setup = {"type": "problem", "problem": problem, "engine": engine, "column_selection": column_selection}
+    threads = [threading.Thread(target=feed_worker, args=(tuple(address), setup, prefixes, pending, results, lock,
+                                                         collect, timeout), daemon=True)
+               for address in addresses]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if len(results) != len(prefixes):
+        raise RuntimeError("Every worker was lost with {0} of {1} subproblems left".format(
+            len(prefixes) - len(results), len(prefixes)))
+    return [results[prefix_id] for prefix_id in range(len(prefixes))]
+
+
+# Main coordinator function: Counts the solutions of a problem on remote workers
+# Arguments: see distributed_map
+# Return: total number of solutions
+def distributed_count(problem, addresses, depth=3, engine="array", column_selection="scan", timeout=DEFAULT_TIMEOUT):
+    return sum(distributed_map(problem, addresses, depth, engine, column_selection, False, timeout))
+
+
+# Main coordinator function: Finds every solution of a problem on remote workers, in single search order
+# Arguments: see distributed_map
+# Return: list of solutions, each a list of row indices
+def distributed_solutions(problem, addresses, depth=3, engine="array", column_selection="scan",
+                          timeout=DEFAULT_TIMEOUT):
+    solutions = []
+    for prefix_solutions in distributed_map(problem, addresses, depth, engine, column_selection, True, timeout):
+        solutions.extend(prefix_solutions)
+    return solutions
+
+
+# Helper function: Parses a 'host:port' command line argument
+# Arguments: text = the argument
+# Return: (host, port)
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed DLX: run a worker, or count N-Queens on workers.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    worker_parser = commands.add_parser("worker", help="listen for a coordinator")
+    worker_parser.add_argument("--host", default="127.0.0.1")
+    worker_parser.add_argument("--port", type=int, default=0)
+    count_parser = commands.add_parser("count", help="count N-Queens solutions on the given workers")
+    count_parser.add_argument("n", type=int)
+    count_parser.add_argument("workers", nargs="+", type=parse_address, help="worker addresses as host:port")
+    count_parser.add_argument("--depth", type=int, default=3)
+    count_parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                              help="seconds to wait for a worker's reply before giving its subproblem to another")
+    arguments = parser.parse_args()
+    if arguments.command == "worker":
+        run_worker(arguments.host, arguments.port)
+    else:
+        print(distributed_count(parallel_dlx.n_queen_problem(arguments.n), arguments.workers, arguments.depth,
+                                timeout=arguments.timeout))
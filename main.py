@@ -1,6 +1,21 @@
 # Imports
+import argparse
+import contextlib
+import json
+import os
+import sys
 import numpy as np
 import time
+import components
+import problems
+from search_stats import SearchStats
+from matrix_loader import FILE_FORMATS, load_exact_cover, read_exact_cover
+from memo_count import CountCache, MAX_ENTRIES, memo_count
+from zdd import build_zdd
+from reduction import build_reduced, reduce_problem
+from solution_writer import open_solution_writer
+from step_logger import LOG_OFF, StepLogger, log_hooks, log_level
+from time_budget import TimeBudgetExceeded, time_budget
 
 def user_interface():
     print("Welcome to DLX\n",
@@ -19,10 +34,7 @@ def user_interface():
                 print("Would you like an extensive log of all steps taken? (Will increase execution time of DLX)\n",
                       "Please answer: (Y/N)")
                 log_decision = input().upper()
-            if log_decision:
-                begin_dlx_n_queen(n, True)
-            else:
-                begin_dlx_n_queen(n, False)
+            begin_dlx_n_queen(n, log_decision == 'Y')
             return None
         elif choice == 'B':
             print("You have chosen option B:\t Solve your favourite matrix.")
@@ -35,23 +47,14 @@ def user_interface():
             print("If the file is in the same directory as I am, no need to input the path.")
             filename = input("Filename (and path): ")
             try:
-                if delimiter_type == 'A':
-                    input_matrix = py.loadtxt(filename, dtype = int, delimiter=',')
-                    print(input_matrix)
-                elif delimiter_type == 'B':
-                    input_matrix = py.loadtxt(filename, dtype=int)
-                    print(input_matrix)
                 log_decision = 'Z'
                 while log_decision != 'Y' and log_decision != 'N':
                     print("Would you like an extensive log of all steps taken? (Will increase execution time of DLX)\n",
                           "Please answer: (Y/N)")
                     log_decision = input().upper()
-                if log_decision:
-                    begin_dlx_user_input_matrix(input_matrix, True)
-                else:
-                    begin_dlx_user_input_matrix(input_matrix, False)
+                begin_dlx_user_input_file(filename, log_decision == 'Y', delimiter=',' if delimiter_type == 'A' else None)
                 return None
-            except:
+            except (OSError, ValueError):
                 print("Error: Could not open file, please try again")
                 return None
             return None
@@ -62,7 +65,7 @@ def user_interface():
 # Arguments: n = size of board
 # Return: one_zero = Empty matrix
 def create_one_zero_matrix(n):
-    one_zero = np.zeros(((n**2), (2*(3*n-3))), dtype=int)
+    one_zero = np.zeros(((n**2), n_queen_column_count(n)), dtype=np.int8)  # Only ever holds 0 or 1
     return one_zero
 
 
@@ -70,47 +73,144 @@ def create_one_zero_matrix(n):
 # Arguments: one_zero_matrix = empty 1-0 matrix created by 'create_one_zero_matrix', n = size of board
 # Return: one_zero_matrix = matrix defining the exact cover problem
 def populate_one_zero_matrix(one_zero_matrix, n):
-    counter = 0
-    # Iterate over the row indices, from (0,j) to (n,j)
-    for i in range(n):
-        x = i
-        # Iterate over the column indices, from (i,0) to (i,n)
-        for k in range(n):
-            current_row = []    # Define an emtpy row, with length equal to the number of constraints
-            for p in range(2 * (3 * n - 3)):
-                current_row.append(0)
-            y = k
+    for counter, row in enumerate(n_queen_rows(n)):
+        one_zero_matrix[counter, row] = 1
+    return one_zero_matrix
+
+
+# Specific NQueens function: Number of constraints (columns) of the N-Queens exact cover problem
+# The n ranks and n files, and the 2n - 3 diagonals and backward diagonals of two squares or more. A 1 by 1 board has
+# no such diagonal, only its rank and file.
+# Arguments: n = size of board
+# Return: number of columns
+def n_queen_column_count(n):
+    return 2 * n + 2 * max(2 * n - 3, 0)
+
+
+# Specific NQueens function: Generates the rows of the N-Queens exact cover problem in sparse form
+# Row x*n + y is the queen placed on rank x, file y, the same order as the rows of populate_one_zero_matrix.
+# Only the 2-4 constraints the placement satisfies are generated, so no dense matrix is needed.
+# Arguments: n = size of board
+# Return: generator of column index lists, in increasing column order
+def n_queen_rows(n):
+    for x in range(n):
+        for y in range(n):
+            row = [x, y + n]    # Rank and file constraints
             # Compute the diagonal and backward diagonal constraints
             diag_constraint = (2*n - 1) + x + y
             back_diag_constraint = 5*n - 5 - x + y
-            # Now populate the current row with 1's wherever constraints are satisfied
-            current_row[x] = 1
-            current_row[y + n] = 1
             # Check to see if this is a significant diagonal
             if (2 * n - 1) < diag_constraint < (4*n - 3):
-                current_row[diag_constraint] = 1
+                row.append(diag_constraint)
             # Check to see if this is a significant backward diagonal
             if (4*n - 3) <= back_diag_constraint < (6*n - 6):
-                current_row[back_diag_constraint] = 1
-            one_zero_matrix[counter] = current_row
-            counter = counter + 1
-    return one_zero_matrix
+                row.append(back_diag_constraint)
+            yield row
+
+
+# Specific NQueens function: The known number of N-Queens solutions for N = 0, 1, 2, ... (OEIS A000170)
+# Used to check the totals found by the different engines and modes.
+N_QUEEN_TOTALS = [1, 1, 0, 0, 2, 10, 4, 40, 92, 352, 724, 2680, 14200, 73712, 365596, 2279184, 14772512, 95815104,
+                  666090624, 4968057848, 39029188884, 314666222712, 2691008701644, 24233937684440]
+
+
+# Specific NQueens function: Reflects a solution in the middle file, i.e. file j becomes file n - j + 1
+# Arguments: rows = the row indices of a solution (row x*n + y is the queen on rank x, file y), n = size of board
+# Return: the row indices of the reflected solution
+def mirror_n_queen_rows(rows, n):
+    return [row - row % n + (n - 1 - row % n) for row in rows]
+
+
+# Specific NQueens function: Finds every N-Queens solution while only searching half of the board.
+# Every solution is the reflection of another in the middle file, so the queen on the first rank is only tried in
+# the first half of the files. Each solution found is yielded together with its reflection, apart from those with the
+# first queen on the middle file (odd N), which are searched separately as their reflections are found directly.
+# Arguments: overall_list = list object built from n_queen_rows and transformed with transform_n_queen
+# n = size of board, log = boolean value specifying if the user desires an extensive log
+# Return: generator of solutions, each a list of row indices
+def n_queen_symmetric_solutions(overall_list, n, log=False):
+    for y in range((n + 1) // 2):
+        overall_list.select_rows([y])   # The queen on rank 1, file y + 1
+        solutions = overall_list.iter_solutions(log=log)
+        try:
+            for rows in solutions:
+                yield rows
+                if 2 * y + 1 != n:
+                    yield mirror_n_queen_rows(rows, n)
+        finally:
+            solutions.close()
+            overall_list.unselect_rows()
+
+
+# Specific NQueens function: Counts the N-Queens solutions while only searching half of the board, as above
+# Arguments: overall_list = list object built from n_queen_rows and transformed with transform_n_queen
+# n = size of board
+# Return: total number of solutions
+def n_queen_symmetric_count(overall_list, n):
+    total = 0
+    for y in range((n + 1) // 2):
+        overall_list.select_rows([y])
+        count = overall_list.count_solutions()
+        overall_list.unselect_rows()
+        if 2 * y + 1 == n:
+            total = total + count   # The middle file of an odd board
+        else:
+            total = total + 2 * count   # These solutions and their reflections
+    overall_list.total_solutions = total
+    return total
+
+
+# Specific NQueens function: Checks the counts of the symmetric search against the known totals
+# Arguments: n_values = the board sizes to check, engine = see create_linked_list
+# Return: True if every count matched
+def check_n_queen_symmetric_totals(n_values=range(4, 13), engine="array"):
+    all_match = True
+    for n in n_values:
+        overall_list = create_linked_list(engine)
+        overall_list.build_from_rows(n_queen_rows(n), n_queen_column_count(n))
+        overall_list.transform_n_queen(n, write_file=False)
+        total = n_queen_symmetric_count(overall_list, n)
+        match = total == N_QUEEN_TOTALS[n]
+        all_match = all_match and match
+        print("N = {0}: {1} solutions, expected {2}{3}".format(n, total, N_QUEEN_TOTALS[n], "" if match else " MISMATCH"))
+    return all_match
+
+
+# Helper function: Converts a dense 1-0 matrix into sparse rows, only positions holding a 1 are kept
+# Arguments: matrix = the 1-0 matrix
+# Return: generator of column index lists, one per row
+def dense_rows(matrix):
+    for row in matrix:
+        yield np.flatnonzero(np.asarray(row) == 1).tolist()
+
+
+# Helper function: Converts a matrix in compressed sparse row (CSR) form into sparse rows
+# Row i holds the columns indices[indptr[i]:indptr[i + 1]], as in scipy.sparse.csr_matrix
+# Arguments: indptr = row pointer array, indices = column index array
+# Return: generator of column index lists, one per row
+def csr_rows(indptr, indices):
+    indptr = np.asarray(indptr)
+    indices = np.asarray(indices)
+    for i in range(len(indptr) - 1):
+        yield indices[indptr[i]:indptr[i + 1]].tolist()
+
 
 # Class declaration for the regular nodes.
 # All attributes initialised to 'None' by default
 class Node:
-    def __init__(self, left=None, right=None, up=None, down=None, column=None):
+    def __init__(self, left=None, right=None, up=None, down=None, column=None, row=None):
         self.left = left        # Points to the (node/column header) to the left of this object
         self.right = right      # Points to the (node/column header) to the right of this object
         self.up = up            # Points to the (node/column header) above this object
         self.down = down        # Points to the (node/column header) below this object
         self.column = column    # Points to the column header of the column this object belongs to
+        self.row = row          # Index of the matrix row this object came from
 
 
 # Class declaration for the column headers
 # All attributes initialised to 'None' or '0' by default, except primary attribute set to 'True'
 class Column:
-    def __init__(self, left=None, right=None, up=None, down=None, size=0, name=None, primary=True):
+    def __init__(self, left=None, right=None, up=None, down=None, size=0, name=None, primary=True, index=None):
         self.left = left        # Points to the (node/column header) to the left of this object
         self.right = right      # Points to the (node/column header) to the right of this object
         self.up = up            # Points to the (node/column header) above this object
@@ -118,20 +218,33 @@ class Column:
         self.size = size        # Refers to the number of nodes in this object's column (below)
         self.name = name        # Cosmetic attribute for outputting solutions
         self.primary = primary  # If set to 'False' object cannot be chosen by DLX and can be unsatisfied for solutions
+        self.index = index      # Original index of the column in the matrix
 
 
 # Class declaration for the overall list object.
 # The master header is specified initially and its attributes are defined accordingly.
 # The solution_list/total_solutions variables are initialised.
 # The main and log file names are stored as attributes of this object.
+# A fresh master node is created for every list object, so several lists can exist at once (e.g. when benchmarking).
 class FourWayLinkedList:
-    def __init__(self, main_file_name="main_output.txt", log_file_name="log.txt", master_node=Column(name="Master",primary=False)):
+    def __init__(self, main_file_name="main_output.txt", log_file_name="log.txt", master_node=None):
+        if master_node is None:
+            master_node = Column(name="Master", primary=False)
+        self.engine = "object"              # Name of the engine, see create_linked_list
         self.main_file = main_file_name     # Store name of MAIN file for access later
         self.log_file = log_file_name       # Store name of LOG file for access later
         self.master_node = master_node      # Create a column header to be the master node
         self.solution_list = []             # Used to store the nodes in the solution
         self.total_solutions = 0            # Used to count the number of solutions, for labelling their output later
         self.header_list = []               # Stores the original order of header names, for outputting solutions
+        self.column_selection = "scan"      # How search chooses columns: 'scan' or 'size_buckets', see search
+        self.row_nodes = []                 # The first node of each matrix row (None for an empty row)
+        self.column_headers = []            # The column headers in their original order
+        self.step_logger = None             # The StepLogger of the current run, see step_logging
+        self.log_sample = 1                 # Only every log_sample-th branch/backtrack is logged
+        self.stats = None                   # SearchStats counting the work of every search, see search_stats.py
+        self.prefix_length = 0              # Number of rows at the start of the solution list chosen by select_rows
+        self.deadline = None                # time.monotonic() at which the searches stop, see time_budget.py
 
     # Helper function: Finds a named column's index
     # Starts at the master node
@@ -160,11 +273,12 @@ class FourWayLinkedList:
     # Sets the column.primary attributes to false for the diagonal and back diagonal constraints.
     # Calls the NQueen specific file write function, to record these changes for the user.
     # Arguments: n = number of ranks/files of the board
+    # write_file = if False the main output file is not touched, used when only counting solutions
     # Return: None
-    def transform_n_queen(self, n):
+    def transform_n_queen(self, n, write_file=True):
         current_column = self.master_node
         # Iterate over all headers, using a for loop to easily track the index
-        for i in range(2 * (3 * n - 3)):
+        for i in range(n_queen_column_count(n)):
             current_column = current_column.right  # Step right
             if i < n:   # Ranks
                 current_column.name = "Rank {0}".format(i + 1)
@@ -176,10 +290,25 @@ class FourWayLinkedList:
             else:   # Back Diagonals
                 current_column.name = "Back Diagonal {0}".format(int((i % (4*n - 3)) + 1))
                 current_column.primary = False
-        self.file_write_n_queen(n)  # Write the according introduction to the main output file
+        if write_file:
+            self.file_write_n_queen(n)  # Write the according introduction to the main output file
         self.create_original_header_list()  # Needs to be called again here as the column header's names have changed
         return None
 
+    # Helper function: Names the column headers, and marks the columns from n_primary on as non-primary.
+    # Every primary column must come before every non-primary one, see dlx.
+    # Arguments: names = list of the names of the columns, in order
+    # n_primary = (optional) the number of primary columns, all of them if None
+    # Return: None
+    def set_columns(self, names, n_primary=None):
+        if len(names) != len(self.column_headers):
+            raise ValueError("{0} names given for {1} columns".format(len(names), len(self.column_headers)))
+        for i, column in enumerate(self.column_headers):
+            column.name = names[i]
+            column.primary = n_primary is None or i < n_primary
+        self.create_original_header_list()  # The column header's names have changed
+        return None
+
     # Helper function: Updates the solution list by adding a new node
     # The list index is changed to the new node, or the new node is appended if the index is out of range
     # Arguments: new_node = the new node to be added to the solution
@@ -221,7 +350,7 @@ class FourWayLinkedList:
     # Return: None
     def begin_file_writing(self, log):
         self.main_file_initial()
-        if log:
+        if log_level(log) != LOG_OFF:
             self.log_file_initial()
         return None
 
@@ -261,7 +390,7 @@ class FourWayLinkedList:
         solution_file = open(self.main_file, "a")  # Open the file in append mode
         solution_file.write("Here we have the classic N-Queens exact cover problem, with:\n")
         solution_file.write("N = {0}\n".format(N))
-        solution_file.write("The columns of the matrix above correspond to the row, column and diagonal constraints.\n")
+        solution_file.write("The columns of the exact cover matrix correspond to the row, column and diagonal constraints.\n")
         solution_file.write("While the rows correspond to possible queen placements.\n")
         solution_file.close()
         return None
@@ -276,45 +405,33 @@ class FourWayLinkedList:
         solution_file.close()
         return None
 
-    # File function: Write a single iteration of DLX to the log
-    # This write will include the depth of the algorithm as well as the row it has chosen to try.
-    # This will also record a BACKTRACK in the log, depending on the backtrack argument
-    # Arguments: node = the node/row to be recorded
-    # k = the depth of the algorithm at this time, default = 0
-    # backtrack[boolean] = whether or not to record a backtrack in the log, default = False
-    # Return: None
-    def file_write_log_row(self, node, k=0, backtrack=False):
-        log_file = open(self.log_file, "a")
-        # If the algorithm is in a 'dead-end' record a backtrack in the log
-        if backtrack:
-            log_file.write("BACKTRACK necessary,\t")
-            log_file.write(node.name)
-            log_file.write("\tis a dead constraint.\n")
-        # Otherwise write this row into the solution
-        else:
-            current_node = self.find_furthest_left(node)
-            #current_node = node
-            # Write the current depth of the algorithm
-            log_file.write("k={0}\n".format(k))
-            # Simple placeholder
-            #log_file.write("Rank:\t")
-            log_file.write(current_node.column.name)
-            dummy_node = current_node.right
-            # Iterate across the row, writing the name of the node's column header each time
-            while dummy_node != current_node:
-                log_file.write("\t")
-                log_file.write(dummy_node.column.name)
-                dummy_node = dummy_node.right
-            log_file.write("\n")
-        log_file.close()
-        return None
+    # File function: Opens the step logger for a run, unless one is open already.
+    # The log is written by a background thread (see step_logger.py), the search only hands it integers.
+    # Use as a context manager: with overall_list.step_logging(log) as logger: ...
+    # Arguments: log = boolean value or log level, see step_logger.log_level
+    # Return: context manager giving the StepLogger, or None if nothing is to be logged
+    @contextlib.contextmanager
+    def step_logging(self, log):
+        level = log_level(log)
+        if level == LOG_OFF or self.step_logger is not None:
+            yield self.step_logger if level != LOG_OFF else None
+            return
+        self.step_logger = StepLogger(self, level, self.log_sample)
+        try:
+            yield self.step_logger
+        finally:
+            logger, self.step_logger = self.step_logger, None
+            logger.close()
 
     # File function: Used to write a single solution to either output file
     # The filename is passed as an argument here allowing this to be used in both the main output and log files
     # Some bad practice here, with if statements. Open to suggestions.
     # Arguments: main_file = boolean value, true for the main file, false for the log file
+    # nodes = (optional) one node of each row of the solution, by default the solution list
     # Return: None
-    def file_write_solution(self, main_file=True):
+    def file_write_solution(self, main_file=True, nodes=None):
+        if nodes is None:
+            nodes = self.solution_list
         # Only update the counter for the main output file, otherwise we would update twice for each solution
         if main_file:
             self.total_solutions = self.total_solutions + 1
@@ -327,8 +444,8 @@ class FourWayLinkedList:
         # This sub-header provides the solution number, equal to the total number of solutions at the time of writing
         file.write("Solution {0}\n".format(self.total_solutions))
         # Write the entire solution list to the file
-        for i in range(len(self.solution_list)):
-            furthest_left = self.find_furthest_left(self.solution_list[i])
+        for i in range(len(nodes)):
+            furthest_left = self.find_furthest_left(nodes[i])
             # Write the node in the solution, as well as the node to the right of it
             file.write(furthest_left.column.name)
             file.write(", ")
@@ -338,26 +455,12 @@ class FourWayLinkedList:
         file.close()
         return None
 
-    # Helper function: Finds a column header's original index, regardless of any current covered columns.
-    # This function facilitates the find_furthest_left function, to ensure rows of the solution always start with the
-    # furthest left node.
-    # Arguments: name = the name of the column to be searched for
-    # Return: index = the column header's original index.
-    # Note this can also return None, if no match was found for the inputted name.
-    def find_original_index_by_name(self, name):
-        index = 0
-        for i in range(len(self.header_list)):
-            if name == self.header_list[i]:
-                return index
-            index = index + 1
-        print("Warning: No matching name found in the original column header list.")
-        return None
-
-    # Helper function: Initialises the header list, used to ensure the order in which nodes in the solution are written
-    # to file, is correct. This MUST be called each time the column header's names change.
+    # Helper function: Initialises the header list, the names of the column headers in their original order.
+    # Call again each time the column header's names change.
     # Arguments: None
     # Return: None
     def create_original_header_list(self):
+        self.header_list = []
         current_header = self.master_node.right
         while current_header != self.master_node:
             self.header_list.append(current_header.name)
@@ -366,64 +469,81 @@ class FourWayLinkedList:
 
     # Helper function: Finds the furthest left node in a row. Used to ensure the order in which nodes in the solution
     # are written to file are correct.
+    # build_from_rows links each row from left to right, so this is simply the first node of the node's row, found in
+    # O(1) from the node's row index.
     # Arguments: current_node = a node in the row to be searched
-    # Return: best_node = the furthest left node
+    # Return: the furthest left node
     def find_furthest_left(self, current_node):
-        dummy_node, best_node = current_node.left, current_node
-        #best_node = current_node
-        best_index = self.find_original_index_by_name(current_node.column.name)
-        while dummy_node != current_node:
-            dummy_index = self.find_original_index_by_name(dummy_node.column.name)
-            if dummy_index < best_index:
-                best_node, best_index = dummy_node, dummy_index
-                #best_index = dummy_index
-            dummy_node = dummy_node.left
-        return best_node
+        return self.row_nodes[current_node.row]
 
 
     # Core function: This very important function converts a exact cover matrix into a general list object
     # No checks are performed to see if the problem is well defined
-    # The column headers are given default names in the format: "constraint {i}" from 0, number of constraints
-    # This function has three sections:
-    #   1.) Create the column headers
-    #   2.) Create the rows
-    #   3.) Join any loose ends on the left/right of rows, and top/bottom of columns
+    # This is a thin adapter over build_from_rows: the matrix is recorded in the main output file, then only the
+    # positions of its 1s are passed on to be linked.
     # Arguments: matrix = the 1-0 matrix to be converted
     # Return: master_node = the master node of the list object, so its pointer can be stored elsewhere outside
     # these methods
     def convert_exact_cover(self, matrix, log):
         self.begin_file_writing(log)
         self.file_write_one_zero(matrix)  # First record the matrix in the main output file
-        dims = np.shape(matrix)  # Find the dimensions of the matrix
-        x, y = dims  # Number of rows, number of columns
+        x, y = np.shape(matrix)  # Number of rows, number of columns
+        return self.build_from_rows(dense_rows(matrix), y)
+
+    # Core function: Converts a sparse exact cover problem into a general list object
+    # Each row is given as the list of column indices holding a 1, for CSR arrays see csr_rows.
+    # Arguments: rows = iterable of column index lists, one per row of the matrix
+    # n_columns = the number of columns of the matrix
+    # log = boolean value specifying if the user desires an extensive log
+    # Return: master_node = the master node of the list object
+    def convert_sparse_exact_cover(self, rows, n_columns, log):
+        self.begin_file_writing(log)
+        return self.build_from_rows(rows, n_columns)
+
+    # Core function: Links the column headers and rows of an exact cover problem, without writing any files
+    # The column headers are given default names in the format: "constraint {i}" from 0, number of constraints
+    # Each new node is linked in O(1): its column header is found directly from a list of the headers, and the
+    # header's up pointer is always the bottom node of the column, so the column never needs to be walked.
+    # Arguments: rows = iterable of column index lists, one per row of the matrix
+    # n_columns = the number of columns of the matrix
+    # Return: master_node = the master node of the list object
+    def build_from_rows(self, rows, n_columns):
         # Create the column headers
+        headers = []
         previous_header = self.master_node
-        for i in range(y):
-            new = Column(left=previous_header, right=self.master_node, name="Constraint {0}".format(i))  # Initialise new column header
+        self.master_node.left, self.master_node.right = self.master_node, self.master_node
+        for i in range(n_columns):
+            new = Column(left=previous_header, right=self.master_node, name="Constraint {0}".format(i), index=i)  # Initialise new column header
             new.up, new.down = new, new
             previous_header.right = new
             self.master_node.left = new
+            headers.append(new)
             previous_header = new   # Update pointer for next iteration
-        # Create each row
-        for i in range(x):
-            current_row = matrix[i]     # Extract corresponding row from 1-0 Matrix
-            # Iterate over the extracted row
-            prev_node = None
-            for j in range(len(current_row)):
-                current_node = Node()
-                current_node.left, current_node.right = current_node, current_node
-                if current_row[j] == 1:         # If significant, as we only record 1s from the 1-0 matrix
-                    if prev_node is not None:
-                        current_node.right, prev_node.right.left = prev_node.right, current_node
-                        current_node.left, prev_node.right = prev_node, current_node
-                    current_node.column = self.find_column_by_index(j + 1)          # Define column header for new node
-                    current_node.column.size = current_node.column.size + 1
-                    current_above = current_node.column
-                    while current_above.down != current_node.column:            # Find 'lowest' node in the column
-                        current_above = current_above.down
-                    current_above.down, current_node.column.up = current_node, current_node
-                    current_node.up, current_node.down = current_above, current_node.column
-                    prev_node = current_node
+        self.column_headers = headers
+        # Create each row, from left to right
+        for i, row in enumerate(rows):
+            first_node = None
+            previous = None
+            for j in sorted(row):
+                if j < 0 or j >= n_columns:
+                    raise ValueError("Column index {0} is outside the matrix".format(j))
+                if j == previous:
+                    raise ValueError("Column index {0} is given twice in row {1}".format(j, i))
+                previous = j
+                column = headers[j]
+                bottom = column.up  # The tail of the column
+                current_node = Node(up=bottom, down=column, column=column, row=i)
+                bottom.down, column.up = current_node, current_node
+                column.size = column.size + 1
+                if first_node is None:
+                    current_node.left, current_node.right = current_node, current_node
+                    first_node = current_node
+                else:
+                    last_node = first_node.left     # Join between the last node of the row and the first
+                    current_node.left, current_node.right = last_node, first_node
+                    last_node.right, first_node.left = current_node, current_node
+            self.row_nodes.append(first_node)
+        self.create_original_header_list()
         return self.master_node
 
     # DLX helper function: Cover a column of the list object
@@ -431,11 +551,12 @@ class FourWayLinkedList:
     # Alters the links around a column header, and around the nodes in each row of a column such that they are removed
     # from the list.
     # Arguments: column = the column header of the column to be covered
-    # Return: None
+    # Return: updates = the number of nodes unlinked from their columns (Knuth's updates, see search_stats.py)
     def cover_column(self, column):
         # Remove column header from the header chain
         column.left.right = column.right  # Alter link to the left
         column.right.left = column.left  # Alter link to the right
+        updates = 0
         # Iterate down through the column
         current_down = column.down
         while current_down != column:
@@ -445,9 +566,10 @@ class FourWayLinkedList:
                 current_right.down.up = current_right.up  # Alter link below
                 current_right.up.down = current_right.down  # Alter link above
                 current_right.column.size = current_right.column.size - 1  # Alter column size
+                updates = updates + 1
                 current_right = current_right.right  # Step right
             current_down = current_down.down  # Step down
-        return None
+        return updates
 
     # DLX helper function: Uncover a column of the list object
     # Implemented as directly as possible from Dancing Links paper by Knuth.
@@ -488,15 +610,15 @@ class FourWayLinkedList:
 
     # DLX helper function: Check to see if the current list object has an columns of size=0, if it does the constraint
     # is dead. In this case a backtrack is necessary.
-    # Arguments: None
-    # Return: None
-    def dead_constraint(self, log):
+    # Arguments: logger = (optional) the StepLogger to record the backtrack with
+    # Return: True if a backtrack is necessary
+    def dead_constraint(self, logger=None):
         current_header = self.master_node.right
         while current_header != self.master_node:
             # We do not care is non-primary constraints are dead
             if current_header.primary and current_header.size <= 0:
-                if log:
-                    self.file_write_log_row(current_header, backtrack=True)  # Log this backtrack
+                if logger is not None and logger.backtracks:
+                    logger.backtrack(current_header.index)  # Log this backtrack
                 return True
             current_header = current_header.right
         return False
@@ -504,9 +626,17 @@ class FourWayLinkedList:
     # Main DLX function: This is where we lose ourselves to dance(Daft Punk).
     # This calls many of the methods above.
     # This is a recursive function, see report for more details
-    # Arguments: k = depth of the algorithm
+    # Arguments: k = depth of the algorithm, log = boolean value or log level, see step_logging
     # Return: None
     def dlx(self, k, log=True):
+        with self.step_logging(log) as logger:
+            self.dlx_nodes(k, logger)
+        return None
+
+    # DLX helper function: The recursive search itself, see dlx
+    # Arguments: k = depth of the algorithm, logger = the StepLogger of the run, or None
+    # Return: None
+    def dlx_nodes(self, k, logger):
         #print("Starting algorithm DLX. k=", k)  # DEBUG
         # self.print()  # DEBUG
         # self.print_solution()  # DEBUG
@@ -514,14 +644,15 @@ class FourWayLinkedList:
         if not self.master_node.right.primary:
             #print("O frabjous day! Callooh! Callay!")  # DEBUG
             #self.print_solution()  # DEBUG
+            del self.solution_list[k:]  # Drop rows left over from deeper, earlier branches
             # Write this solution to both output files
             self.file_write_solution(True)
-            if log:
-                self.file_write_solution(False)
+            if logger is not None and logger.solutions:
+                logger.solution(self.total_solutions, self.solution_rows())
             return None
         else:
             # Check to see if there are any dead constraints
-            if self.dead_constraint(log):
+            if self.dead_constraint(logger):
                 #print("Dead constraint, need to backtrack")  # DEBUG
                 # Return as the problem is not well defined anymore
                 return None
@@ -536,8 +667,8 @@ class FourWayLinkedList:
                 self.set_solution_k(current_node, k)  # Add this to the solution list, will be overwritten if not a
                 # solution.
                 # Record this step of the algorithm in the log
-                if log:
-                    self.file_write_log_row(current_node, k, backtrack=False)
+                if logger is not None and logger.branches:
+                    logger.branch(current_node.row, k)
                 # Iterate across this row
                 current_right = current_node.right
                 while current_right != current_node:
@@ -546,7 +677,7 @@ class FourWayLinkedList:
                     current_right = current_right.right  # step right
                 # print("Recursive call")  # DEBUG
                 # Call dlx again, with depth += 1
-                self.dlx(k+1, log)
+                self.dlx_nodes(k+1, logger)
                 current_node = self.solution_list[k]  # Retrieve the current node from the solution list
                 current_column = current_node.column  # Find its column
                 # Iterate left to uncover
@@ -559,43 +690,1044 @@ class FourWayLinkedList:
             self.uncover_column(current_column)  # Uncover the column originally chosen as best
         return None
 
+    # Main DLX function: The same search as dlx, without recursion, written as a generator.
+    # Each time a solution is found the search pauses and yields, with the solution list holding the chosen rows.
+    # The solution list is used as an explicit stack of the row chosen at each depth, alongside a stack of the column
+    # chosen at each depth. Rows are tried and undone in exactly the same order as dlx, so the output is identical,
+    # however there is no Python frame per level and the depth is not limited by the interpreter's recursion limit.
+    # The dead constraint check and the choice of best column share a single pass over the headers, and the covering
+    # and uncovering of each row is written out inline, as the method calls cost more than the link updates.
+    # If the generator is closed before the search is finished, every link is restored before it exits.
+    # The search itself is search_scan, or search_size_buckets when column_selection is 'size_buckets', or
+    # search_instrumented when the stats attribute holds a SearchStats (see search_stats.py).
+    # Arguments: log = boolean value or log level, see step_logging
+    # Return: generator, yielding None for each solution
+    def search(self, log=True):
+        with self.step_logging(log) as logger:
+            if self.stats is not None:
+                yield from self.search_instrumented(logger, self.stats)
+            elif self.column_selection == "size_buckets":
+                yield from self.search_size_buckets(logger)
+            else:
+                yield from self.search_scan(logger)
+        return None
+
+    # Main DLX function: The search of the column with the fewest rows by a pass over the headers, see search
+    # Arguments: logger = the StepLogger of the run, or None
+    # Return: generator, yielding None for each solution
+    def search_scan(self, logger=None):
+        log_branch, log_backtrack = log_hooks(logger)
+        master_node = self.master_node
+        solution = self.solution_list
+        del solution[self.prefix_length:]  # Rows chosen by select_rows stay in the solution
+        columns = []    # The column chosen as best at each depth
+        deadline = self.deadline
+        try:
+            while True:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeBudgetExceeded()  # Only between nodes, never halfway through a cover
+                current_node = None
+                # If the only constraints remaining are non-primary ones, we have found a solution!
+                if not master_node.right.primary:
+                    yield None
+                else:
+                    # One pass over the headers: check for dead constraints and find the best column together
+                    current_header = master_node.right
+                    best_header = current_header
+                    while current_header != master_node:
+                        if current_header.primary:
+                            if current_header.size <= 0:
+                                if log_backtrack is not None:
+                                    log_backtrack(current_header.index)  # Log this backtrack
+                                best_header = None
+                                break
+                            if current_header.size < best_header.size:
+                                best_header = current_header
+                        current_header = current_header.right
+                    if best_header is not None:
+                        self.cover_column(best_header)
+                        if best_header.down != best_header:
+                            columns.append(best_header)
+                            current_node = best_header.down  # The first row to try at this depth
+                        else:
+                            self.uncover_column(best_header)
+                # Backtrack until some depth has another row left to try
+                while current_node is None and columns:
+                    current_node = solution.pop()
+                    # Iterate left to uncover the columns of this row
+                    current_left = current_node.left
+                    while current_left != current_node:
+                        column = current_left.column
+                        current_up = column.up
+                        while current_up != column:
+                            dummy_node = current_up.left
+                            while dummy_node != current_up:
+                                dummy_node.column.size = dummy_node.column.size + 1
+                                dummy_node.down.up = dummy_node
+                                dummy_node.up.down = dummy_node
+                                dummy_node = dummy_node.left
+                            current_up = current_up.up
+                        column.left.right = column
+                        column.right.left = column
+                        current_left = current_left.left
+                    current_node = current_node.down    # Step down
+                    if current_node == columns[-1]:
+                        # Every row of this column has been tried
+                        self.uncover_column(columns.pop())
+                        current_node = None
+                if current_node is None:
+                    return None     # The whole tree has been explored
+                # Add this row to the solution and cover its columns, before going a level deeper
+                solution.append(current_node)
+                if log_branch is not None:
+                    log_branch(current_node.row, len(solution) - 1)
+                current_right = current_node.right
+                while current_right != current_node:
+                    column = current_right.column
+                    column.left.right = column.right
+                    column.right.left = column.left
+                    current_down = column.down
+                    while current_down != column:
+                        dummy_node = current_down.right
+                        while dummy_node != current_down:
+                            dummy_node.down.up = dummy_node.up
+                            dummy_node.up.down = dummy_node.down
+                            dummy_node.column.size = dummy_node.column.size - 1
+                            dummy_node = dummy_node.right
+                        current_down = current_down.down
+                    current_right = current_right.right
+        finally:
+            self.restore_levels(columns)    # If the search was stopped early, restore every link before leaving
+
+    # Main DLX function: search_scan or search_size_buckets (as column_selection), counting its work into a SearchStats
+    # (see search_stats.py). This is a separate copy of the search so that the normal searches carry no counters at
+    # all. The columns are chosen and the rows tried in the same order as the search it stands for, and the updates are
+    # counted by cover_column (or cover_column_buckets) as they unlink the nodes.
+    # Arguments: logger = the StepLogger of the run, or None, stats = the SearchStats to count into
+    # Return: generator, yielding None for each solution
+    def search_instrumented(self, logger, stats):
+        log_branch, log_backtrack = log_hooks(logger)
+        master_node = self.master_node
+        solution = self.solution_list
+        del solution[self.prefix_length:]  # Rows chosen by select_rows stay in the solution
+        columns = []    # The column chosen as best at each depth
+        buckets = self.size_buckets() if self.column_selection == "size_buckets" else None
+        if buckets is None:
+            cover, uncover = self.cover_column, self.uncover_column
+        else:
+            cover = lambda column: self.cover_column_buckets(column, buckets)
+            uncover = lambda column: self.uncover_column_buckets(column, buckets)
+        stats.start()
+        deadline = self.deadline
+        try:
+            while True:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeBudgetExceeded()  # Only between nodes, never halfway through a cover
+                current_node = None
+                stats.enter(len(solution))
+                if not master_node.right.primary:
+                    stats.solutions = stats.solutions + 1
+                    stats.stop()
+                    yield None
+                    stats.start()
+                else:
+                    best_header = None
+                    if buckets is None:
+                        # One pass over the headers: check for dead constraints and find the best column together
+                        current_header = master_node.right
+                        best_header = current_header
+                        while current_header != master_node:
+                            if current_header.primary:
+                                if current_header.size <= 0:
+                                    dead_header, best_header = current_header, None
+                                    break
+                                if current_header.size < best_header.size:
+                                    best_header = current_header
+                            current_header = current_header.right
+                    else:
+                        # The first column of the lowest non-empty bucket, see search_size_buckets
+                        size = 0
+                        while not buckets[size]:
+                            size = size + 1
+                        if size == 0:
+                            dead_header = next(iter(buckets[0]))
+                        else:
+                            best_header = next(iter(buckets[size]))
+                    if best_header is None:
+                        stats.backtracks = stats.backtracks + 1
+                        if log_backtrack is not None:
+                            log_backtrack(dead_header.index)
+                    else:
+                        stats.updates = stats.updates + cover(best_header)
+                        if best_header.down != best_header:
+                            columns.append(best_header)
+                            current_node = best_header.down
+                        else:
+                            uncover(best_header)
+                # Backtrack until some depth has another row left to try
+                while current_node is None and columns:
+                    current_node = solution.pop()
+                    current_left = current_node.left
+                    while current_left != current_node:
+                        uncover(current_left.column)
+                        current_left = current_left.left
+                    current_node = current_node.down
+                    if current_node == columns[-1]:
+                        uncover(columns.pop())
+                        current_node = None
+                if current_node is None:
+                    return None
+                # Add this row to the solution and cover its columns, before going a level deeper
+                stats.branches[len(solution)] = stats.branches[len(solution)] + 1
+                solution.append(current_node)
+                if log_branch is not None:
+                    log_branch(current_node.row, len(solution) - 1)
+                current_right = current_node.right
+                while current_right != current_node:
+                    stats.updates = stats.updates + cover(current_right.column)
+                    current_right = current_right.right
+        finally:
+            self.restore_levels(columns)
+            stats.stop()
+
+    # DLX helper function: Places every uncovered primary column in the bucket of its size, as search_size_buckets
+    # Arguments: None
+    # Return: buckets = list of dictionaries (used as ordered sets), buckets[s] holding the columns of size s
+    def size_buckets(self):
+        primaries = []
+        current_header = self.master_node.right
+        while current_header != self.master_node:
+            if current_header.primary:
+                primaries.append(current_header)
+            current_header = current_header.right
+        buckets = [{} for _ in range(max([column.size for column in primaries], default=0) + 1)]
+        for column in primaries:
+            buckets[column.size][column] = None
+        return buckets
+
+    # DLX helper function: cover_column, also moving the primary columns between the buckets of size_buckets as their
+    # sizes change, in the same order as search_size_buckets
+    # Arguments: column = the column header of the column to be covered, buckets = see size_buckets
+    # Return: the number of nodes unlinked from their columns, see cover_column
+    def cover_column_buckets(self, column, buckets):
+        column.left.right = column.right
+        column.right.left = column.left
+        if column.primary:
+            del buckets[column.size][column]
+        updates = 0
+        current_down = column.down
+        while current_down != column:
+            current_right = current_down.right
+            while current_right != current_down:
+                current_right.down.up = current_right.up
+                current_right.up.down = current_right.down
+                dummy_column = current_right.column
+                size = dummy_column.size
+                dummy_column.size = size - 1
+                if dummy_column.primary:
+                    del buckets[size][dummy_column]
+                    buckets[size - 1][dummy_column] = None
+                updates = updates + 1
+                current_right = current_right.right
+            current_down = current_down.down
+        return updates
+
+    # DLX helper function: uncover_column, returning the columns to their buckets, the inverse of cover_column_buckets
+    # Arguments: column = the column header of the column to be uncovered, buckets = see size_buckets
+    # Return: None
+    def uncover_column_buckets(self, column, buckets):
+        current_up = column.up
+        while current_up != column:
+            current_left = current_up.left
+            while current_left != current_up:
+                dummy_column = current_left.column
+                size = dummy_column.size
+                dummy_column.size = size + 1
+                if dummy_column.primary:
+                    del buckets[size][dummy_column]
+                    buckets[size + 1][dummy_column] = None
+                current_left.down.up = current_left
+                current_left.up.down = current_left
+                current_left = current_left.left
+            current_up = current_up.up
+        column.left.right = column
+        column.right.left = column
+        if column.primary:
+            buckets[column.size][column] = None
+        return None
+
+    # DLX helper function: Undoes the open levels of a search that was stopped early, deepest first
+    # Arguments: columns = the stack of the column chosen at each depth, the solution list holds the row chosen at
+    # each of these depths (apart from possibly the deepest)
+    # Return: None
+    def restore_levels(self, columns):
+        solution = self.solution_list
+        while columns:
+            if len(solution) - self.prefix_length == len(columns):
+                current_node = solution.pop()
+                current_left = current_node.left
+                while current_left != current_node:
+                    self.uncover_column(current_left.column)
+                    current_left = current_left.left
+            self.uncover_column(columns.pop())
+        return None
+
+    # Main DLX function: search, with the column choice backed by buckets of the primary columns, one per size.
+    # buckets[s] holds every uncovered primary column of size s (see size_buckets), and is updated whenever a size
+    # changes by cover_column_buckets and uncover_column_buckets. The best column is then the first column of the lowest
+    # non-empty bucket, and a dead constraint is simply an empty primary column in buckets[0], so neither needs a pass
+    # over the headers. Secondary columns are never chosen, and a solution is found exactly when every bucket is empty.
+    # This pays off on wide matrices, on narrow ones the extra work on every size change can cost more than the pass.
+    # Columns of equal size are chosen in bucket order rather than header order, so the same solutions are found but
+    # possibly in a different order to dlx.
+    # Arguments: logger = the StepLogger of the run, or None
+    # depth = (optional) the number of rows after which to stop going down and yield as if a solution was found, used
+    # to split the search, see parallel_dlx.split_prefixes
+    # Return: generator, yielding None for each solution
+    def search_size_buckets(self, logger=None, depth=None):
+        log_branch, log_backtrack = log_hooks(logger)
+        cover, uncover = self.cover_column_buckets, self.uncover_column_buckets
+        solution = self.solution_list
+        del solution[self.prefix_length:]  # Rows chosen by select_rows stay in the solution
+        columns = []    # The column chosen as best at each depth
+        buckets = self.size_buckets()
+        n_buckets = len(buckets)
+        deadline = self.deadline
+        try:
+            while True:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeBudgetExceeded()  # Only between nodes, never halfway through a cover
+                current_node = None
+                size = 0
+                while size < n_buckets and not buckets[size]:
+                    size = size + 1
+                if size == n_buckets or len(columns) == depth:
+                    yield None  # Every primary column is covered, we have found a solution!
+                elif size == 0:
+                    if log_backtrack is not None:
+                        log_backtrack(next(iter(buckets[0])).index)  # Log this backtrack
+                else:
+                    best_header = next(iter(buckets[size]))
+                    cover(best_header, buckets)
+                    columns.append(best_header)
+                    current_node = best_header.down  # The first row to try at this depth
+                # Backtrack until some depth has another row left to try
+                while current_node is None and columns:
+                    current_node = solution.pop()
+                    current_left = current_node.left
+                    while current_left != current_node:
+                        uncover(current_left.column, buckets)
+                        current_left = current_left.left
+                    current_node = current_node.down    # Step down
+                    if current_node == columns[-1]:
+                        uncover(columns.pop(), buckets)     # Every row of this column has been tried
+                        current_node = None
+                if current_node is None:
+                    return None     # The whole tree has been explored
+                # Add this row to the solution and cover its columns, before going a level deeper
+                solution.append(current_node)
+                if log_branch is not None:
+                    log_branch(current_node.row, len(solution) - 1)
+                current_right = current_node.right
+                while current_right != current_node:
+                    cover(current_right.column, buckets)
+                    current_right = current_right.right
+        finally:
+            self.restore_levels(columns)    # If the search was stopped early, restore every link before leaving
+
+    # Main DLX function: The same search as dlx, without recursion, see search
+    # Arguments: log = boolean value or log level, see step_logging
+    # writer = (optional) an open solution writer (see solution_writer.py) to write the solutions to, instead of
+    # reopening the main output file for each one. The caller is responsible for closing it.
+    # Return: None
+    def dlx_iterative(self, log=True, writer=None):
+        with self.step_logging(log) as logger:
+            log_solutions = logger is not None and logger.solutions
+            for _ in self.search(log):
+                # Write this solution to the output file, and the log
+                if writer is None:
+                    self.file_write_solution(True)
+                else:
+                    self.total_solutions = self.total_solutions + 1
+                    writer.write_solution(self.solution_rows())
+                if log_solutions:
+                    logger.solution(self.total_solutions, self.solution_rows())
+        return None
+
+    # Helper function: The matrix rows of the current solution, in the order they were chosen
+    # Arguments: None
+    # Return: list of row indices
+    def solution_rows(self):
+        return [node.row for node in self.solution_list]
+
+    # Helper function: Names a row as it appears in the output, by the names of its first two columns
+    # Arguments: row = the index of the row
+    # Return: string, e.g. "Rank 3, File 5"
+    def row_label(self, row):
+        furthest_left = self.row_nodes[row]   # The first node of a row is its furthest left
+        return furthest_left.column.name + ", " + furthest_left.right.column.name
 
-def begin_dlx_n_queen(n, log):
+    # Helper function: The names of the columns of a row, from left to right, as written to the log
+    # Arguments: row = the index of the row
+    # Return: list of strings
+    def row_names(self, row):
+        furthest_left = self.row_nodes[row]
+        names = [furthest_left.column.name]
+        current_node = furthest_left.right
+        while current_node != furthest_left:
+            names.append(current_node.column.name)
+            current_node = current_node.right
+        return names
+
+    # Helper function: The name of a column
+    # Arguments: index = the original index of the column
+    # Return: string
+    def column_name(self, index):
+        return self.column_headers[index].name
+
+    # Helper function: The number of columns of the matrix
+    # Arguments: None
+    # Return: integer
+    def column_count(self):
+        return len(self.column_headers)
+
+    # Helper function: The number of primary columns, which is also the most rows a solution can have
+    # Arguments: None
+    # Return: integer
+    def primary_column_count(self):
+        return sum(1 for column in self.column_headers if column.primary)
+
+    # Helper function: Reads the matrix back out of the list object, e.g. to hash it for a binary solution file
+    # Must be called while no columns are covered.
+    # Arguments: None
+    # Return: list of column index lists, one per row of the matrix
+    def matrix_rows(self):
+        index = {column: i for i, column in enumerate(self.column_headers)}
+        rows = []
+        for first_node in self.row_nodes:
+            row = []
+            if first_node is not None:
+                current_node = first_node
+                while True:
+                    row.append(index[current_node.column])
+                    current_node = current_node.right
+                    if current_node is first_node:
+                        break
+            rows.append(row)
+        return rows
+
+    # Main DLX function: Lazily yields the solutions, each as the list of its row indices.
+    # The search only runs far enough to find the next solution, so stopping early (or setting a limit) skips the rest
+    # of the tree. Nothing is written to the output files, apart from the log if one is requested.
+    # Arguments: limit = the maximum number of solutions to yield, None for all of them
+    # log = boolean value or log level, see step_logging
+    # Return: generator of row index lists
+    def iter_solutions(self, limit=None, log=False):
+        if limit is not None and limit <= 0:
+            return
+        searcher = self.search(log)
+        try:
+            found = 0
+            for _ in searcher:
+                yield self.solution_rows()
+                found = found + 1
+                if found == limit:
+                    return
+        finally:
+            searcher.close()    # Restores the links if the search was stopped early
+
+    # DLX helper function: Chooses whole rows before a search, covering every column of each row in turn.
+    # The rows stay at the start of the solution list, and search then only explores the solutions containing them.
+    # This leaves the list in the same state as the search reaching these rows itself, so that the rest of the tree
+    # can be searched separately, e.g. by parallel_dlx.
+    # Arguments: rows = the indices of the rows to choose, in order
+    # Return: None
+    def select_rows(self, rows):
+        for row in rows:
+            node = self.row_nodes[row]
+            self.cover_column(node.column)
+            current_right = node.right
+            while current_right != node:
+                self.cover_column(current_right.column)
+                current_right = current_right.right
+            self.solution_list.append(node)
+            self.prefix_length = self.prefix_length + 1
+        return None
+
+    # DLX helper function: Undoes the last rows chosen by select_rows, in reverse order
+    # Arguments: count = the number of rows to undo, by default all of them
+    # Return: None
+    def unselect_rows(self, count=None):
+        if count is None:
+            count = self.prefix_length
+        del self.solution_list[self.prefix_length:]
+        for _ in range(count):
+            node = self.solution_list.pop()
+            current_left = node.left
+            while current_left != node:
+                self.uncover_column(current_left.column)
+                current_left = current_left.left
+            self.uncover_column(node.column)
+            self.prefix_length = self.prefix_length - 1
+        return None
+
+    # DLX helper function: The rows search would branch on next, from the current state
+    # Arguments: None
+    # Return: None if every primary column is covered (a solution), otherwise the row indices of the best column,
+    # in the order search tries them (empty at a dead constraint)
+    def best_column_rows(self):
+        if not self.master_node.right.primary:
+            return None
+        if self.dead_constraint():
+            return []
+        column = self.find_best_column()
+        rows = []
+        current_down = column.down
+        while current_down != column:
+            rows.append(current_down.row)
+            current_down = current_down.down
+        return rows
+
+    # Main DLX function: Counts the solutions without materialising them.
+    # No rows are looked up, nothing is written and no file is opened, so only the search itself is timed.
+    # Arguments: None
+    # Return: total_solutions = the number of solutions found
+    def count_solutions(self):
+        count = 0
+        for _ in self.search(False):
+            count = count + 1
+        self.total_solutions = count
+        return count
+
+    # Main DLX function: Counts the solutions, caching the count below each set of uncovered columns, see memo_count.py
+    # Arguments: cache = the CountCache to use
+    # Return: the number of solutions below the rows already chosen (if any, see select_rows)
+    def count_memoized(self, cache):
+        return self.memo_search(cache, lambda total, row, count: total + count)
+
+    # Main DLX function: A search that caches a value for each set of uncovered columns, so a set reached again is not
+    # searched again. The set is a bitmask of the uncovered columns (primary and secondary), with bit column.index set
+    # while a column is uncovered. It is updated as each column is covered, and each open level keeps its own.
+    # The value of a solution is 1 and of a dead end 0. The value of any other set starts at 0 and is folded with
+    # join(value, row, value below row) over the rows of the best column, e.g. adding gives the number of solutions
+    # (count_memoized) and making a node for each row gives a ZDD of the solutions (see zdd.py).
+    # The search keeps its own stack of open levels instead of recursing, so it can go as deep as the matrix has rows.
+    # Arguments: cache = the CountCache to use, join = the function folding the rows' values
+    # Return: the value of the rows already chosen (if any, see select_rows)
+    def memo_search(self, cache, join):
+        master_node = self.master_node
+        deadline = self.deadline
+        mask = 0
+        current_header = master_node.right
+        while current_header != master_node:
+            mask = mask | (1 << current_header.index)
+            current_header = current_header.right
+        stack = []  # For each open level: [its mask, its best column, the row searched below it, its value so far]
+        try:
+            while True:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeBudgetExceeded()
+                # The value of this set of uncovered columns, unless it has to be searched in a new level
+                value = cache.get(mask)
+                if value is None:
+                    if not master_node.right.primary:   # Only non-primary columns are left, a solution
+                        value = 1
+                    elif self.dead_constraint():
+                        value = 0
+                    if value is not None:
+                        cache.put(mask, value)
+                    else:
+                        column = self.find_best_column()
+                        self.cover_column(column)
+                        stack.append([mask, column, column, 0])
+                # Fold the value into the level above, closing levels until one has another row left to search
+                while True:
+                    if not stack:
+                        return value
+                    level = stack[-1]
+                    mask, column, current_node = level[0], level[1], level[2]
+                    if value is not None:
+                        current_left = current_node.left
+                        while current_left != current_node:
+                            self.uncover_column(current_left.column)
+                            current_left = current_left.left
+                        level[2] = column   # No row of this level is covered now
+                        level[3] = join(level[3], current_node.row, value)
+                    current_node = current_node.down
+                    if current_node != column:
+                        break
+                    self.uncover_column(column)
+                    stack.pop()
+                    value = level[3]
+                    cache.put(mask, value)
+                # Cover the columns of the next row, then search the set of columns it leaves
+                mask = mask ^ (1 << column.index)
+                current_right = current_node.right
+                while current_right != current_node:
+                    self.cover_column(current_right.column)
+                    mask = mask ^ (1 << current_right.column.index)
+                    current_right = current_right.right
+                level[2] = current_node
+        finally:
+            # If the search was stopped early, undo every open level, deepest first
+            while stack:
+                _, column, current_node, _ = stack.pop()
+                if current_node != column:
+                    current_left = current_node.left
+                    while current_left != current_node:
+                        self.uncover_column(current_left.column)
+                        current_left = current_left.left
+                self.uncover_column(column)
+
+
+# Helper function: Creates an empty list object for the chosen engine
+# The 'object' engine is the FourWayLinkedList above, the 'array' engine stores the same links in flat integer arrays
+# (see array_dlx.py) and the 'bitset' engine searches with bit masks (see bitset_dlx.py). All of them run the same
+# search and give identical output. 'auto' picks one by the shape of the matrix, see choose_engine.
+# Arguments: engine = 'object', 'array', 'bitset' or 'auto', main_file_name/log_file_name = output file names
+# rows, n_columns, n_primary = the matrix to be built, see choose_engine, needed by 'auto' only
+# column_selection = 'scan' or 'size_buckets', see FourWayLinkedList.search. The bitset engine only has 'scan'.
+# Return: the new list object
+def create_linked_list(engine="object", main_file_name="main_output.txt", log_file_name="log.txt", rows=None,
+                       n_columns=None, n_primary=None, column_selection="scan"):
+    if engine == "auto":
+        engine = choose_engine(rows, n_columns, n_primary, column_selection)
+    if engine == "object":
+        overall_list = FourWayLinkedList(main_file_name, log_file_name)
+    elif engine == "array":
+        from array_dlx import ArrayLinkedList  # Imported here as array_dlx builds on this module
+        overall_list = ArrayLinkedList(main_file_name, log_file_name)
+    elif engine == "bitset":
+        if column_selection == "size_buckets":
+            raise ValueError("The bitset engine has no size_buckets search, use the array engine")
+        from bitset_dlx import BitsetLinkedList     # As array_dlx
+        overall_list = BitsetLinkedList(main_file_name, log_file_name)
+    else:
+        raise ValueError("Unknown engine: {0}".format(engine))
+    overall_list.column_selection = column_selection
+    return overall_list
+
+
+# Helper function: Picks the engine for a matrix by its mean row length and column size, see
+# bitset_dlx.BITSET_MIN_COVER_RATIO. The bitset engine is picked when the mean row length times the mean column size
+# is at least BITSET_MIN_COVER_RATIO times the number of primary columns (N-Queens, pentomino tilings, dense random
+# matrices), the array engine otherwise (Sudoku, domino tilings, wide sparse matrices) and whenever the matrix is not
+# known in advance or column_selection is 'size_buckets'.
+# Arguments: rows = list of column index lists, one per row of the matrix, None if unknown
+# n_columns = the number of columns of the matrix, n_primary = the number of primary columns, None if all are
+# column_selection = see create_linked_list
+# Return: engine name
+def choose_engine(rows, n_columns, n_primary=None, column_selection="scan"):
+    from bitset_dlx import BITSET_MIN_COVER_RATIO
+    if rows is None or not n_columns or column_selection == "size_buckets":
+        return "array"
+    n_entries = sum(len(row) for row in rows)
+    n_primary = n_columns if n_primary is None else n_primary
+    # (n_entries / len(rows)) * (n_entries / n_columns) >= ratio * n_primary, without the divisions
+    if n_entries > 0 and n_entries * n_entries >= BITSET_MIN_COVER_RATIO * n_primary * len(rows) * n_columns:
+        return "bitset"
+    return "array"
+
+
+# Entry function: Solves the N-Queens problem with DLX, writing the solutions to '{n}_queen_output.txt'
+# Arguments: n = size of board, log = boolean value or log level specifying the extent of the log, see
+# FourWayLinkedList.step_logging
+# engine = 'object', 'array', 'bitset' or 'auto', see create_linked_list
+# show_matrix = if True the dense 1-0 matrix is created, printed and recorded in the output file. Otherwise the
+# problem is built straight from n_queen_rows and no dense matrix ever exists.
+# count_only = if True the solutions are only counted, no output or log file is opened (log is ignored)
+# column_selection = 'scan' or 'size_buckets', see FourWayLinkedList.search
+# symmetry = if True only half of the first rank is searched and the other solutions are found by reflection, see
+# n_queen_symmetric_solutions. The solutions are then written in a different order.
+# output_format = 'text', 'csv', 'ndjson' or 'binary', see solution_writer.py
+# stats_file = (optional) if given the search is instrumented and its SearchStats report written here as JSON
+# solver = 'dlx', or 'bitboard' for the dedicated N-Queens search of n_queen_bitboard.py, far faster. The list is then
+# only built to write the solutions, and only solutions are logged (no branches or backtracks).
+# same_order = (bitboard only) if True the solutions are written in the same order as DLX, see dlx_order_solutions,
+# otherwise rank by rank
+# Return: (total number of solutions, execution time in seconds)
+def begin_dlx_n_queen(n, log, engine="auto", show_matrix=False, count_only=False, column_selection="scan",
+                      symmetry=False, output_format="text", stats_file=None, solver="dlx", same_order=False):
+    if solver not in ("dlx", "bitboard"):
+        raise ValueError("Unknown solver: {0}".format(solver))
+    if solver == "bitboard" and stats_file is not None:
+        raise ValueError("Search statistics are only kept by the DLX solver")
     start_time = time.time()
     print("Solving N Queens problem, for N = ", n)
-    print("Creating 1-0 Matrix...")
-    one_zero_matrix = create_one_zero_matrix(n)
-    populate_one_zero_matrix(one_zero_matrix, n)
-    print("Done.")
-    print("Solving now for:\n", one_zero_matrix)
-    overall_list = FourWayLinkedList("{0}_queen_output.txt".format(n),"{0}_queen_log.txt".format(n))
-    overall_list.convert_exact_cover(one_zero_matrix, log)
-    overall_list.transform_n_queen(n)
-    master_node = overall_list.master_node
-    #test_circular_list(master_node)
-    overall_list.dlx(0, log)
+    overall_list = create_linked_list(engine, "{0}_queen_output.txt".format(n), "{0}_queen_log.txt".format(n),
+                                      list(n_queen_rows(n)), n_queen_column_count(n), 2 * n, column_selection)
+    if stats_file is not None:
+        overall_list.stats = SearchStats()
+    if show_matrix:
+        print("Creating 1-0 Matrix...")
+        one_zero_matrix = create_one_zero_matrix(n)
+        populate_one_zero_matrix(one_zero_matrix, n)
+        print("Done.")
+        print("Solving now for:\n", one_zero_matrix)
+    bitboard_count = count_only and solver == "bitboard"
+    if not bitboard_count:  # Counting with the bitboard search needs no list at all
+        if show_matrix and count_only:
+            overall_list.build_from_rows(dense_rows(one_zero_matrix), n_queen_column_count(n))
+        elif show_matrix:
+            overall_list.convert_exact_cover(one_zero_matrix, log)
+        elif count_only:
+            overall_list.build_from_rows(n_queen_rows(n), n_queen_column_count(n))
+        else:
+            overall_list.convert_sparse_exact_cover(n_queen_rows(n), n_queen_column_count(n), log)
+        overall_list.transform_n_queen(n, write_file=not count_only)
+    #test_circular_list(overall_list.master_node)
+    if bitboard_count:
+        from n_queen_bitboard import n_queen_bitboard_count     # Imported here as n_queen_bitboard uses this module
+        overall_list.total_solutions = n_queen_bitboard_count(n)
+    elif count_only and symmetry:
+        n_queen_symmetric_count(overall_list, n)
+    elif count_only:
+        overall_list.count_solutions()
+    else:
+        with open_solution_writer(overall_list, output_format, width=n) as writer, \
+                overall_list.step_logging(log) as logger:
+            solutions = None
+            if solver == "bitboard":
+                from n_queen_bitboard import n_queen_bitboard_solutions     # As n_queen_bitboard_count
+                solutions = n_queen_bitboard_solutions(n, symmetry, same_order)
+            elif symmetry:
+                solutions = n_queen_symmetric_solutions(overall_list, n, log)
+            if solutions is not None:
+                for rows in solutions:
+                    overall_list.total_solutions = overall_list.total_solutions + 1
+                    writer.write_solution(rows)
+                    if logger is not None and logger.solutions:
+                        logger.solution(overall_list.total_solutions, rows)
+            else:
+                overall_list.dlx_iterative(log, writer)
+    execution_time = time.time() - start_time
     print("Algorithm DLX finished, execution time:")
     if overall_list.total_solutions == 0:
         print("It appears no solutions were found for your matrix, the problem may not be well defined")
-    print("--- %s seconds ---" % (time.time() - start_time))
-    print("Output can now be seen in '{0}_queen_output.txt'".format(n))
-    return None
+    print("--- %s seconds ---" % execution_time)
+    if count_only:
+        print("Number of solutions: {0}".format(overall_list.total_solutions))
+    else:
+        print("Output can now be seen in '{0}'".format(writer.file_name))
+    if stats_file is not None:
+        overall_list.stats.to_json(stats_file)
+        print("Search statistics can now be seen in '{0}'".format(stats_file))
+    return overall_list.total_solutions, execution_time
 
 
-def begin_dlx_user_input_matrix(user_input_matrix, log):
+# Entry function: Solves a user's matrix with DLX, writing the solutions to 'main_output.txt'
+# Arguments: user_input_matrix = the 1-0 matrix, log = boolean value or log level specifying the extent of the log,
+# see FourWayLinkedList.step_logging
+# engine = 'object', 'array', 'bitset' or 'auto', see create_linked_list
+# count_only = if True the solutions are only counted, no output or log file is opened (log is ignored)
+# column_selection = 'scan' or 'size_buckets', see FourWayLinkedList.search
+# output_format = 'text', 'csv', 'ndjson' or 'binary', see solution_writer.py
+# stats_file = (optional) if given the search is instrumented and its SearchStats report written here as JSON
+# show_matrix = if True the matrix is printed before solving, which can take longer than the solve for large matrices
+# Return: (total number of solutions, execution time in seconds)
+def begin_dlx_user_input_matrix(user_input_matrix, log, engine="auto", count_only=False, column_selection="scan",
+                                output_format="text", stats_file=None, show_matrix=False):
     start_time = time.time()
-    print("Now solving your favourite matrix:\n", user_input_matrix)
-    overall_list = FourWayLinkedList()
-    overall_list.convert_exact_cover(user_input_matrix, log)
-    master_node = overall_list.master_node
-    #test_circular_list(master_node)
-    overall_list.dlx(0, log)
+    if show_matrix:
+        print("Now solving your favourite matrix:\n", user_input_matrix)
+    else:
+        print("Now solving your favourite matrix, of shape", np.shape(user_input_matrix))
+    overall_list = create_linked_list(engine, rows=list(dense_rows(user_input_matrix)),
+                                      n_columns=np.shape(user_input_matrix)[1], column_selection=column_selection)
+    if stats_file is not None:
+        overall_list.stats = SearchStats()
+    if count_only:
+        overall_list.build_from_rows(dense_rows(user_input_matrix), np.shape(user_input_matrix)[1])
+        overall_list.count_solutions()
+    else:
+        overall_list.convert_exact_cover(user_input_matrix, log)
+        #test_circular_list(overall_list.master_node)
+        with open_solution_writer(overall_list, output_format) as writer:
+            overall_list.dlx_iterative(log, writer)
+    execution_time = time.time() - start_time
     print("Algorithm DLX finished, execution time:")
     if overall_list.total_solutions == 0:
         print("It appears no solutions were found for your matrix, the problem may not be well defined")
-    print("--- %s seconds ---" % (time.time() - start_time))
-    print("Output can now be seen in 'main_output.txt'")
-    return None
+    print("--- %s seconds ---" % execution_time)
+    if count_only:
+        print("Number of solutions: {0}".format(overall_list.total_solutions))
+    else:
+        print("Output can now be seen in '{0}'".format(writer.file_name))
+    if stats_file is not None:
+        overall_list.stats.to_json(stats_file)
+        print("Search statistics can now be seen in '{0}'".format(stats_file))
+    return overall_list.total_solutions, execution_time
+
+
+
+# Main function: Solves the exact cover problem held in a file, streaming it into the list object so the whole
+# matrix is never loaded, see matrix_loader.py
+# Arguments: file_name = the file, log = boolean value or log level specifying the extent of the log,
+# see FourWayLinkedList.step_logging
+# file_format = 'dense', 'sparse' or 'dlx', see matrix_loader.FILE_FORMATS
+# delimiter = ',' or None for whitespace, for the dense and sparse formats
+# engine, count_only, column_selection, output_format, stats_file = see begin_dlx_user_input_matrix. The shape of the
+# matrix is only known once the file is read, so 'auto' gives the array engine here.
+# Return: (total number of solutions, execution time in seconds)
+def begin_dlx_user_input_file(file_name, log, file_format="dense", delimiter=None, engine="auto", count_only=False,
+                              column_selection="scan", output_format="text", stats_file=None):
+    start_time = time.time()
+    print("Now solving the matrix in", file_name)
+    overall_list = create_linked_list(engine, column_selection=column_selection)
+    if stats_file is not None:
+        overall_list.stats = SearchStats()
+    if count_only:
+        load_exact_cover(overall_list, file_name, file_format, delimiter)
+        overall_list.count_solutions()
+    else:
+        load_exact_cover(overall_list, file_name, file_format, delimiter, log)
+        with open_solution_writer(overall_list, output_format) as writer:
+            overall_list.dlx_iterative(log, writer)
+    execution_time = time.time() - start_time
+    print("Algorithm DLX finished, execution time:")
+    if overall_list.total_solutions == 0:
+        print("It appears no solutions were found for your matrix, the problem may not be well defined")
+    print("--- %s seconds ---" % execution_time)
+    if count_only:
+        print("Number of solutions: {0}".format(overall_list.total_solutions))
+    else:
+        print("Output can now be seen in '{0}'".format(writer.file_name))
+    if stats_file is not None:
+        overall_list.stats.to_json(stats_file)
+        print("Search statistics can now be seen in '{0}'".format(stats_file))
+    return overall_list.total_solutions, execution_time
+
+
+# Batch function: Loads a 1-0 matrix from a text file
+# Arguments: file_name = the file, delimiter = 'comma' or 'whitespace'
+# Return: numpy matrix
+def load_matrix(file_name, delimiter="whitespace"):
+    return np.loadtxt(file_name, dtype=np.int8, delimiter="," if delimiter == "comma" else None, ndmin=2)
+
+
+# Batch function: Builds the list object for a batch run, as chosen on the command line
+# Arguments: arguments = the parsed command line, see batch_parser
+# Return: (the list object, the dense matrix or None when the problem was built without one,
+# the Reduction of the problem or None when it was not reduced, see reduction.py)
+def build_batch_list(arguments):
+    main_file = arguments.out
+    if main_file is None:
+        main_file = "{0}_queen_output.txt".format(arguments.n) if arguments.problem == "n-queens" else "main_output.txt"
+    log_file = arguments.log_file
+    if log_file is None:
+        log_file = "{0}_queen_log.txt".format(arguments.n) if arguments.problem == "n-queens" else "log.txt"
+    write_files = arguments.output != "count"
+    matrix = None
+    names, n_primary = None, None
+    if arguments.problem == "matrix":
+        # The file is streamed into the list, so the dense matrix is only loaded when it is to be shown
+        if arguments.show_matrix and arguments.format == "dense":
+            matrix = load_matrix(arguments.input, arguments.delimiter)
+        delimiter = "," if arguments.delimiter == "comma" else None
+        rows, n_columns, names, n_primary = read_exact_cover(arguments.input, arguments.format, delimiter)
+    elif arguments.problem == "n-queens":
+        rows, n_columns, n_primary = n_queen_rows(arguments.n), n_queen_column_count(arguments.n), 2 * arguments.n
+        if arguments.show_matrix:
+            matrix = populate_one_zero_matrix(create_one_zero_matrix(arguments.n), arguments.n)
+    else:
+        if arguments.problem == "sudoku":
+            problem = problems.sudoku_problem(problems.SUDOKU_PUZZLES.get(arguments.puzzle, arguments.puzzle))
+        elif arguments.problem == "pentomino":
+            height, _, width = arguments.board.partition("x")
+            problem = problems.pentomino_problem(int(height), int(width))
+        else:
+            height, _, width = arguments.board.partition("x")
+            problem = problems.domino_problem(int(height), int(width))
+        rows, n_columns = problem["rows"], problem["n_columns"]
+    rows = list(rows)
+    overall_list = create_linked_list(arguments.engine, main_file, log_file, rows, n_columns, n_primary,
+                                      arguments.column_selection)
+    overall_list.log_sample = arguments.log_sample
+    reduction = None
+    if arguments.reduce:
+        reduction = reduce_problem(rows, n_columns, n_primary)
+        build_reduced(overall_list, reduction, names, arguments.log if write_files else None)
+    else:
+        if write_files:
+            overall_list.convert_sparse_exact_cover(rows, n_columns, arguments.log)
+        else:
+            overall_list.build_from_rows(rows, n_columns)
+        if names is not None:
+            overall_list.set_columns(names, n_primary)
+        if arguments.problem == "n-queens":
+            overall_list.transform_n_queen(arguments.n, write_file=write_files)
+    if not write_files and log_level(arguments.log) != LOG_OFF:
+        overall_list.log_file_initial()     # Otherwise begun by the conversion functions
+    return overall_list, matrix, reduction
+
+
+# Batch function: The command line of a batch run
+# Arguments: None
+# Return: argparse parser
+def batch_parser():
+    parser = argparse.ArgumentParser(description="Solve an exact cover problem with DLX, without any prompts. A JSON "
+                                                 "summary of the run is printed, run with no arguments for the "
+                                                 "interactive menu.")
+    parser.add_argument("problem", choices=["n-queens", "matrix", "sudoku", "pentomino", "domino"])
+    parser.add_argument("-n", type=int, help="size of the board, for n-queens")
+    parser.add_argument("--input", help="file holding the 1-0 matrix, for matrix")
+    parser.add_argument("--format", choices=FILE_FORMATS, default="dense",
+                        help="layout of the input file, see matrix_loader.py")
+    parser.add_argument("--delimiter", choices=["whitespace", "comma"], default="whitespace",
+                        help="separator of the values in the input file")
+    parser.add_argument("--puzzle", default="easy", help="81 character puzzle, or the name of one of "
+                                                         "problems.SUDOKU_PUZZLES, for sudoku")
+    parser.add_argument("--board", default="6x10", help="board as HEIGHTxWIDTH, for pentomino and domino")
+    parser.add_argument("--output", choices=["count", "text", "csv", "ndjson", "binary"], default="count",
+                        help="only count the solutions, or write them in this format")
+    parser.add_argument("--out", help="name of the main output file")
+    parser.add_argument("--log", choices=["off", "solutions", "branches", "backtracks"], default="off",
+                        help="extent of the log")
+    parser.add_argument("--log-file", help="name of the log file")
+    parser.add_argument("--log-sample", type=int, default=1, help="only log every k-th branch and backtrack")
+    parser.add_argument("--time-budget", type=float, help="stop the search after this many seconds")
+    parser.add_argument("--engine", choices=["object", "array", "bitset", "auto"], default="auto",
+                        help="list engine, 'auto' picks one by the shape of the matrix, see choose_engine")
+    parser.add_argument("--column-selection", choices=["scan", "size_buckets"], default="scan")
+    parser.add_argument("--symmetry", action="store_true", help="only search half the first rank, for n-queens")
+    parser.add_argument("--stats", help="instrument the search and write its statistics to this JSON file")
+    parser.add_argument("--reduce", action="store_true", help="reduce the matrix before solving (duplicate, forced "
+                                                              "and dominated rows and columns), see reduction.py")
+    parser.add_argument("--components", action="store_true", help="search each independent component of the matrix "
+                                                                  "on its own, see components.py")
+    parser.add_argument("--workers", type=int, default=1, help="processes counting components at once, with "
+                                                               "--components and --output count")
+    parser.add_argument("--memo", action="store_true", help="count with a cache of the count below each set of "
+                                                            "uncovered columns, see memo_count.py")
+    parser.add_argument("--memo-size", type=int, default=MAX_ENTRIES, help="most counts kept by --memo, or sets of "
+                                                                           "uncovered columns kept by --zdd")
+    parser.add_argument("--zdd", action="store_true", help="build a ZDD of every solution first, then count or list "
+                                                           "them from it, see zdd.py")
+    parser.add_argument("--zdd-export", help="write the ZDD to this file, as dot (.dot), JSON (.json) or text")
+    parser.add_argument("--zdd-samples", type=int, default=0, help="number of solutions drawn uniformly at random "
+                                                                   "from the ZDD, listed in the summary")
+    parser.add_argument("--show-matrix", action="store_true", help="print the 1-0 matrix (to stderr) before solving")
+    return parser
+
+
+# Entry function: Solves a single problem as described by the command line, see batch_parser.
+# Nothing is asked and nothing is printed to stdout apart from a JSON summary of the run, holding the number of
+# solutions, whether the search was complete (False if the time budget ran out) and the files written.
+# Arguments: argv = the command line arguments, default sys.argv[1:]
+# Return: exit status
+def batch_main(argv=None):
+    parser = batch_parser()
+    arguments = parser.parse_args(argv)
+    if arguments.problem == "n-queens" and arguments.n is None:
+        parser.error("n-queens needs -n")
+    if arguments.problem == "n-queens" and arguments.n < 1:
+        parser.error("-n must be at least 1")
+    if arguments.problem == "matrix" and arguments.input is None:
+        parser.error("matrix needs --input")
+    if arguments.symmetry and arguments.problem != "n-queens":
+        parser.error("--symmetry only applies to n-queens")
+    if arguments.components and arguments.symmetry:
+        parser.error("--components and --symmetry cannot be used together")
+    if arguments.engine == "bitset" and arguments.column_selection == "size_buckets":
+        parser.error("the bitset engine has no size_buckets search, use --engine array or auto")
+    if arguments.workers < 1:
+        parser.error("--workers must be at least 1")
+    if arguments.memo and (arguments.output != "count" or arguments.symmetry or arguments.components):
+        parser.error("--memo only counts, use it with --output count and without --symmetry or --components")
+    if arguments.zdd and (arguments.symmetry or arguments.components or arguments.memo):
+        parser.error("--zdd cannot be used with --symmetry, --components or --memo")
+    if arguments.stats is not None and (arguments.memo or arguments.zdd or arguments.components):
+        parser.error("--stats only counts the plain search, use it without --memo, --zdd or --components")
+    if (arguments.zdd_export is not None or arguments.zdd_samples) and not arguments.zdd:
+        parser.error("--zdd-export and --zdd-samples need --zdd")
+    if arguments.reduce and (arguments.symmetry or arguments.output not in ("count", "csv", "ndjson")):
+        parser.error("--reduce only gives original row indices, use it with --output count, csv or ndjson")
+    start_time = time.time()
+    overall_list, matrix, reduction = build_batch_list(arguments)
+    if arguments.memo and reduction is not None and not reduction.infeasible and not reduction.one_to_one():
+        parser.error("--reduce merged duplicate rows, which --memo cannot count, use --memo without --reduce")
+    if arguments.show_matrix and matrix is not None:
+        np.savetxt(sys.stderr, matrix, fmt="%i")
+    if arguments.stats is not None:
+        overall_list.stats = SearchStats()
+    writer = None
+    cache = None
+    diagram = None
+    complete = True
+    try:
+        with contextlib.ExitStack() as stack:
+            if arguments.output != "count":
+                width = arguments.n if arguments.problem == "n-queens" else None
+                writer = stack.enter_context(open_solution_writer(overall_list, arguments.output, width=width))
+            logger = stack.enter_context(overall_list.step_logging(arguments.log))
+            # Entered last so it is the first to end, before the log and the writer are closed
+            deadline = stack.enter_context(time_budget(overall_list, arguments.time_budget))
+            if arguments.symmetry:
+                solutions = n_queen_symmetric_solutions(overall_list, arguments.n, arguments.log)
+            elif reduction is not None and reduction.infeasible:
+                solutions = []
+            elif arguments.memo:
+                cache = CountCache(arguments.memo_size)
+                memo_count(overall_list, cache)
+                solutions = []
+            elif arguments.zdd:
+                diagram = build_zdd(overall_list, arguments.memo_size)
+                if writer is None and (logger is None or not logger.solutions) and (
+                        reduction is None or reduction.one_to_one()):
+                    overall_list.total_solutions = diagram.count()
+                    solutions = []
+                else:
+                    solutions = iter(diagram)
+            elif arguments.components and writer is None and (logger is None or not logger.solutions) and (
+                    reduction is None or reduction.one_to_one()):
+                # Only counting, so the counts of the components are simply multiplied
+                problem = components.list_problem(overall_list)
+                overall_list.total_solutions = components.component_count(problem, arguments.engine,
+                                                                          arguments.column_selection, arguments.workers,
+                                                                          deadline)
+                solutions = []
+            elif arguments.components:
+                solutions = components.component_solutions(components.list_problem(overall_list), arguments.engine,
+                                                           arguments.column_selection, deadline)
+            else:
+                solutions = overall_list.iter_solutions(log=arguments.log)
+            for rows in solutions:
+                # A reduced solution stands for one solution for each choice of duplicate rows, written in the
+                # original row indices. The log names the rows of the reduced list.
+                for original_rows in ([rows] if reduction is None else reduction.expand(rows)):
+                    overall_list.total_solutions = overall_list.total_solutions + 1
+                    if writer is not None:
+                        writer.write_solution(original_rows)
+                    if logger is not None and logger.solutions:
+                        logger.solution(overall_list.total_solutions, rows)
+    except TimeBudgetExceeded:
+        complete = False
+    summary = {"problem": arguments.problem, "engine": overall_list.engine,
+               "column_selection": arguments.column_selection, "solutions": overall_list.total_solutions,
+               "complete": complete, "time": time.time() - start_time,
+               "output": writer.file_name if writer is not None else None,
+               "log": overall_list.log_file if arguments.log != "off" else None, "stats": arguments.stats}
+    if arguments.problem == "n-queens":
+        summary["n"] = arguments.n
+    if reduction is not None:
+        summary["reduction"] = reduction.report
+    if cache is not None:
+        summary["memo"] = cache.report()
+    if diagram is not None:
+        summary["zdd"] = {"nodes": len(diagram), "export": arguments.zdd_export}
+        if arguments.zdd_export is not None:
+            extension = os.path.splitext(arguments.zdd_export)[1]
+            diagram.export(arguments.zdd_export, {".dot": "dot", ".json": "json"}.get(extension, "text"))
+        samples = [diagram.sample() for _ in range(arguments.zdd_samples)]
+        if reduction is not None:
+            # Only uniform over the original solutions when each reduced solution stands for just one of them
+            samples = [next(reduction.expand(rows)) for rows in samples if rows is not None] if (
+                reduction.one_to_one()) else None
+        summary["zdd"]["samples"] = samples
+    if arguments.stats is not None:
+        overall_list.stats.to_json(arguments.stats)
+    print(json.dumps(summary))
+    return 0
 
 
 def test_circular_list(master_node):
@@ -614,4 +1746,7 @@ def test_circular_list(master_node):
     return None
 
 
-user_interface()
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(batch_main())
+    user_interface()
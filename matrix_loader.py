@@ -0,0 +1,233 @@
+# Imports
+import os
+import struct
+import numpy as np
+
+# Text formats of exact cover matrices read by this module. The rows are streamed straight into build_from_rows, so
+# only the positions of the 1s are ever held, never the whole matrix:
+#   'dense' = one matrix row per line, its 0/1 values separated by commas or whitespace
+#   'sparse' = one matrix row per line, listing the (from 0) column indices of its 1s, separated by commas or whitespace
+#   'dlx' = Knuth's DLX format: the first line names the items (columns), primary items first, then '|' and the
+#   secondary items. Every other line is an option (row), naming its items. Lines starting with '|' are comments.
+# Blank lines, and lines starting with '#' in the dense and sparse formats, are skipped.
+# The binary formats are memory mapped and decoded a chunk of rows at a time, straight into the list:
+#   'npy' = a 2D numpy array saved with np.save, of any integer or boolean type
+#   'packed' = a bit-packed matrix written by save_packed_matrix, see below
+FILE_FORMATS = ("dense", "sparse", "dlx", "npy", "packed")
+
+# Roughly how many matrix entries are parsed at once from a dense, npy or packed file
+CHUNK_CELLS = 1 << 20
+
+# Bit-packed matrix files hold a 16 byte header, followed by each row as np.packbits of its 0/1 values, padded with 0
+# bits to a whole number of bytes. The number of rows comes from the file size.
+# Header, little endian: magic (4 bytes) = b"DLXM", version (uint16), unused (uint16), number of columns (uint64)
+PACKED_MAGIC = b"DLXM"
+PACKED_VERSION = 1
+PACKED_HEADER_FORMAT = "<4sHHQ"
+PACKED_HEADER_SIZE = 16
+
+
+# Helper function: The non-blank, non-comment lines of a text file
+# Arguments: file = open text file, comment = the character starting a comment line
+# Return: generator of stripped lines
+def data_lines(file, comment):
+    for line in file:
+        line = line.strip()
+        if line and not line.startswith(comment):
+            yield line
+
+
+# Helper function: Splits a line on commas or whitespace
+# Arguments: line = the line, delimiter = ',' or None for whitespace
+# Return: list of fields
+def split_line(line, delimiter):
+    if delimiter is None:
+        return line.split()
+    return [field.strip() for field in line.split(delimiter)]
+
+
+# Loader function: Streams the rows of a dense 0/1 text file, a chunk of lines at a time.
+# Each chunk is parsed by numpy and immediately reduced to the column indices of its 1s.
+# Arguments: file_name = the file, delimiter = ',' or None for whitespace, chunk_cells = see CHUNK_CELLS
+# Return: (generator of column index lists, number of columns)
+def dense_file_rows(file_name, delimiter=None, chunk_cells=CHUNK_CELLS):
+    with open(file_name) as file:
+        first_line = next(data_lines(file, "#"), None)
+    if first_line is None:
+        return iter(()), 0
+    n_columns = len(split_line(first_line, delimiter))
+    chunk_rows = max(1, chunk_cells // max(1, n_columns))
+
+    def rows():
+        with open(file_name) as file:
+            lines = data_lines(file, "#")
+            while True:
+                chunk = [line for _, line in zip(range(chunk_rows), lines)]
+                if not chunk:
+                    return
+                matrix = np.loadtxt(chunk, dtype=np.int8, delimiter=delimiter, ndmin=2)
+                if matrix.shape[1] != n_columns:
+                    raise ValueError("Every row of '{0}' must have {1} values".format(file_name, n_columns))
+                for row in matrix:
+                    yield np.flatnonzero(row == 1).tolist()
+
+    return rows(), n_columns
+
+
+# Loader function: Streams the rows of a sparse text file, one line of column indices per row.
+# Without n_columns the file is read twice, first to find the largest column index.
+# Arguments: file_name = the file, delimiter = ',' or None for whitespace, n_columns = (optional) number of columns
+# Return: (generator of column index lists, number of columns)
+def sparse_file_rows(file_name, delimiter=None, n_columns=None):
+    if n_columns is None:
+        n_columns = 0
+        with open(file_name) as file:
+            for line in data_lines(file, "#"):
+                n_columns = max(n_columns, max(int(field) for field in split_line(line, delimiter)) + 1)
+
+    def rows():
+        with open(file_name) as file:
+            for line in data_lines(file, "#"):
+                yield [int(field) for field in split_line(line, delimiter)]
+
+    return rows(), n_columns
+
+
+# Loader function: Reads the items of a file in Knuth's DLX format, and streams its options
+# Arguments: file_name = the file
+# Return: (generator of column index lists, list of item names, number of primary items)
+def dlx_file_rows(file_name):
+    with open(file_name) as file:
+        item_line = next(data_lines(file, "|"), None)
+    if item_line is None:
+        raise ValueError("'{0}' does not name any items".format(file_name))
+    primary, _, secondary = item_line.partition("|")
+    names = primary.split() + secondary.split()
+    index = {}
+    for i, name in enumerate(names):
+        if ":" in name:
+            raise ValueError("Item '{0}': colours are not supported".format(name))
+        if name in index:
+            raise ValueError("Item '{0}' is named twice".format(name))
+        index[name] = i
+
+    def rows():
+        with open(file_name) as file:
+            lines = data_lines(file, "|")
+            next(lines)     # The item line
+            for line in lines:
+                row = []
+                for name in line.split():
+                    if name not in index:
+                        raise ValueError("Option '{0}' uses the unknown item '{1}'".format(line, name))
+                    row.append(index[name])
+                if len(set(row)) != len(row):
+                    raise ValueError("Option '{0}' names an item twice".format(line))
+                yield row
+
+    return rows(), names, len(primary.split())
+
+
+# Helper function: Streams the rows of a 0/1 matrix (or memory map), a chunk of rows at a time
+# Arguments: matrix = 2D array, decode = function turning a chunk of rows into a 0/1 array, chunk_rows = rows per chunk
+# Return: generator of column index lists
+def matrix_chunk_rows(matrix, decode, chunk_rows):
+    for start in range(0, matrix.shape[0], chunk_rows):
+        chunk = decode(matrix[start:start + chunk_rows])
+        rows, columns = np.nonzero(chunk == 1)
+        # np.nonzero lists the 1s row by row, so the columns of each row are one slice of columns
+        ends = np.searchsorted(rows, np.arange(1, chunk.shape[0] + 1)).tolist()
+        columns = columns.tolist()
+        begin = 0
+        for end in ends:
+            yield columns[begin:end]
+            begin = end
+
+
+# Loader function: Streams the rows of a .npy file, memory mapped so only one chunk of rows is read at a time
+# Arguments: file_name = the file, chunk_cells = see CHUNK_CELLS
+# Return: (generator of column index lists, number of columns)
+def npy_file_rows(file_name, chunk_cells=CHUNK_CELLS):
+    matrix = np.load(file_name, mmap_mode="r")
+    if matrix.ndim != 2:
+        raise ValueError("'{0}' does not hold a 2D matrix".format(file_name))
+    n_columns = matrix.shape[1]
+    return matrix_chunk_rows(matrix, np.asarray, max(1, chunk_cells // max(1, n_columns))), n_columns
+
+
+# Loader function: Streams the rows of a bit-packed matrix file, memory mapped and unpacked a chunk of rows at a time
+# Arguments: file_name = the file, chunk_cells = see CHUNK_CELLS
+# Return: (generator of column index lists, number of columns)
+def packed_file_rows(file_name, chunk_cells=CHUNK_CELLS):
+    with open(file_name, "rb") as file:
+        header = file.read(PACKED_HEADER_SIZE)
+    if len(header) < PACKED_HEADER_SIZE or header[:4] != PACKED_MAGIC:
+        raise ValueError("'{0}' is not a bit-packed matrix file".format(file_name))
+    _, version, _, n_columns = struct.unpack(PACKED_HEADER_FORMAT, header)
+    if version != PACKED_VERSION:
+        raise ValueError("'{0}' has unknown version {1}".format(file_name, version))
+    row_bytes = (n_columns + 7) // 8
+    n_rows = (os.path.getsize(file_name) - PACKED_HEADER_SIZE) // row_bytes if row_bytes else 0
+    if n_rows == 0:
+        return iter(()), n_columns
+    matrix = np.memmap(file_name, dtype=np.uint8, mode="r", offset=PACKED_HEADER_SIZE, shape=(n_rows, row_bytes))
+
+    def decode(chunk):
+        return np.unpackbits(chunk, axis=1, count=n_columns)
+
+    return matrix_chunk_rows(matrix, decode, max(1, chunk_cells // max(1, n_columns))), n_columns
+
+
+# Writer function: Writes a matrix as a bit-packed matrix file, a row at a time, so it may come from any loader
+# Arguments: file_name = the file, rows = iterable of column index lists, one per row, n_columns = number of columns
+# Return: the number of rows written
+def save_packed_matrix(file_name, rows, n_columns):
+    n_rows = 0
+    bits = np.zeros(n_columns, dtype=np.uint8)
+    with open(file_name, "wb") as file:
+        file.write(struct.pack(PACKED_HEADER_FORMAT, PACKED_MAGIC, PACKED_VERSION, 0, n_columns))
+        for row in rows:
+            bits[:] = 0
+            bits[row] = 1
+            file.write(np.packbits(bits).tobytes())
+            n_rows = n_rows + 1
+    return n_rows
+
+
+# Loader function: Streams the rows of a matrix file of any format
+# Arguments: file_name = the file, file_format = one of FILE_FORMATS
+# delimiter = ',' or None for whitespace (dense and sparse only)
+# Return: (generator of column index lists, number of columns, list of column names or None,
+# number of primary columns or None when every column is primary)
+def read_exact_cover(file_name, file_format="dense", delimiter=None):
+    names, n_primary = None, None
+    if file_format == "dense":
+        rows, n_columns = dense_file_rows(file_name, delimiter)
+    elif file_format == "sparse":
+        rows, n_columns = sparse_file_rows(file_name, delimiter)
+    elif file_format == "dlx":
+        rows, names, n_primary = dlx_file_rows(file_name)
+        n_columns = len(names)
+    elif file_format == "npy":
+        rows, n_columns = npy_file_rows(file_name)
+    elif file_format == "packed":
+        rows, n_columns = packed_file_rows(file_name)
+    else:
+        raise ValueError("Unknown file format: {0}".format(file_format))
+    return rows, n_columns, names, n_primary
+
+
+# Main loader function: Builds a list object straight from a matrix file, without ever holding the whole matrix
+# Arguments: overall_list = an empty list object, file_name = the file, file_format = one of FILE_FORMATS
+# delimiter = ',' or None for whitespace (dense and sparse only), log = boolean value or log level, see
+# FourWayLinkedList.step_logging. None builds the list without touching any output files.
+# Return: master_node = the master node of the list object
+def load_exact_cover(overall_list, file_name, file_format="dense", delimiter=None, log=None):
+    rows, n_columns, names, n_primary = read_exact_cover(file_name, file_format, delimiter)
+    if log is None:
+        master_node = overall_list.build_from_rows(rows, n_columns)
+    else:
+        master_node = overall_list.convert_sparse_exact_cover(rows, n_columns, log)
+    if names is not None:
+        overall_list.set_columns(names, n_primary)
+    return master_node
@@ -0,0 +1,72 @@
+# Imports
+from collections import OrderedDict
+
+# Memoized counting of solutions.
+# Once some rows are chosen, the rest of the search only depends on which columns are still uncovered: the rows left
+# are exactly those whose columns are all uncovered. Different orders of earlier choices (very common in tilings)
+# reach the same set of uncovered columns again and again, so the number of solutions below each set is cached and
+# every later visit costs a single lookup.
+# The set is kept as a bitmask with bit j set while column j is uncovered. Covering a column clears its bit, so the
+# mask is updated incrementally as the search goes down, and each level keeps its own mask, so nothing needs undoing
+# as it comes back up. Secondary columns are part of the mask too, as they also decide which rows are left.
+
+# Default most number of cached counts
+MAX_ENTRIES = 1 << 20
+
+
+# Class declaration for the cache of memo_count, a table of counts bounded in size, dropping the least recently used
+# count once full. Its counters show how well the cache did:
+#   hits/misses = lookups that found/did not find a count
+#   evictions = counts dropped to make room
+class CountCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.counts = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Helper function: Looks up the count of a set of uncovered columns
+    # Arguments: mask = the bitmask of the uncovered columns
+    # Return: the count, or None if it is not cached
+    def get(self, mask):
+        count = self.counts.get(mask)
+        if count is None:
+            self.misses = self.misses + 1
+            return None
+        self.hits = self.hits + 1
+        self.counts.move_to_end(mask)
+        return count
+
+    # Helper function: Caches the count of a set of uncovered columns, dropping the least recently used count if full
+    # Arguments: mask = the bitmask of the uncovered columns, count = its number of solutions
+    # Return: None
+    def put(self, mask, count):
+        if self.max_entries <= 0:
+            return None
+        self.counts[mask] = count
+        if len(self.counts) > self.max_entries:
+            self.counts.popitem(last=False)
+            self.evictions = self.evictions + 1
+        return None
+
+    # Report function: The counters as a dictionary, ready for JSON
+    # Arguments: None
+    # Return: dictionary
+    def report(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions, "entries": len(self.counts), "max_entries": self.max_entries}
+
+
+# Main counting function: Counts the solutions of a list object, caching the count below each set of uncovered columns.
+# The search is the list's count_memoized, with either engine, below any rows already chosen with select_rows.
+# The answer is always the same as count_solutions.
+# Arguments: overall_list = the list object, cache = (optional) the CountCache to use, e.g. to read its counters
+# afterwards. A cache must only be reused for the same list object.
+# Return: total_solutions = the number of solutions, also stored in overall_list.total_solutions
+def memo_count(overall_list, cache=None):
+    if cache is None:
+        cache = CountCache()
+    overall_list.total_solutions = overall_list.count_memoized(cache)
+    return overall_list.total_solutions
@@ -0,0 +1,190 @@
+# Imports
+import numpy as np
+from main import mirror_n_queen_rows
+
+# A dedicated N-Queens solver, without any exact cover matrix. The board is searched rank by rank, and the files and
+# both diagonals already attacked are each held as one integer with a bit per file:
+#   cols = the files holding a queen
+#   d1/d2 = the squares of the current rank attacked along a diagonal/backward diagonal. Moving down a rank shifts
+#   them one file to the left/right, so they always line up with the files of the rank being filled.
+# The free squares of a rank are then ~(cols | d1 | d2), and placing a queen is three ORs and two shifts.
+# The solutions are the same as those of DLX, as row indices (row x*n + y is the queen on rank x, file y, see
+# n_queen_rows), so they are written and labelled exactly as before.
+
+# Most partial boards expanded at once by n_queen_bitboard_count, bounding its memory
+MAX_STATES = 1 << 16
+
+
+# Count function: Counts the completions of a block of partial boards, all filled up to the same rank.
+# The boards are numpy arrays of (cols, d1, d2), and each rank is placed on every board of the block at once, one file
+# at a time. A block that grows past MAX_STATES boards is split and its parts counted one after the other.
+# Arguments: n = size of board, cols/d1/d2 = int64 arrays of the boards, rank = the rank to fill next
+# Return: number of solutions
+def count_block(n, cols, d1, d2, rank):
+    full = np.int64((1 << n) - 1)
+    free = ~(cols | d1 | d2) & full
+    if rank == n - 1:
+        # The last rank: every free square completes a board
+        return sum(int(np.count_nonzero((free >> y) & 1)) for y in range(n))
+    new_cols, new_d1, new_d2 = [], [], []
+    for y in range(n):
+        chosen = ((free >> y) & 1).astype(bool)
+        if chosen.any():
+            bit = np.int64(1 << y)
+            new_cols.append(cols[chosen] | bit)
+            new_d1.append(((d1[chosen] | bit) << 1) & full)
+            new_d2.append((d2[chosen] | bit) >> 1)
+    if not new_cols:
+        return 0
+    cols, d1, d2 = np.concatenate(new_cols), np.concatenate(new_d1), np.concatenate(new_d2)
+    total = 0
+    for start in range(0, len(cols), MAX_STATES):
+        end = start + MAX_STATES
+        total = total + count_block(n, cols[start:end], d1[start:end], d2[start:end], rank + 1)
+    return total
+
+
+# Main count function: Counts the N-Queens solutions with the bitboard search.
+# The queen of the first rank is only placed in the first half of the files, the solutions with it in the other half
+# being their reflections in the middle file, see n_queen_symmetric_count.
+# Arguments: n = size of board
+# Return: total number of solutions
+def n_queen_bitboard_count(n):
+    if n <= 1:
+        return 1
+    full = np.int64((1 << n) - 1)
+    first = np.array([1 << y for y in range(n // 2)], dtype=np.int64)
+    total = 2 * count_block(n, first, (first << 1) & full, first >> 1, 1)
+    if n % 2 == 1:
+        middle = np.array([1 << (n // 2)], dtype=np.int64)
+        total = total + count_block(n, middle, (middle << 1) & full, middle >> 1, 1)
+    return total
+
+
+# Solution function: Yields the N-Queens solutions rank by rank, each rank's queen tried from the first file on.
+# The solutions come in lexicographic order of their files, each as its rows from the first rank to the last.
+# Arguments: n = size of board, first_file = (optional) the file (from 0) of the queen of the first rank, fixed
+# Return: generator of solutions, each a list of row indices
+def rank_order_solutions(n, first_file=None):
+    if n == 0:
+        yield []
+        return None
+    full = (1 << n) - 1
+    files = [0] * n     # The file of the queen of each rank
+    cols, d1, d2 = [0] * n, [0] * n, [0] * n    # The attacked squares of each rank, before its queen is placed
+    free = [0] * n  # The free squares of each rank not yet tried
+    rank = 0
+    if first_file is not None:
+        files[0] = first_file
+        if n == 1:
+            yield [first_file]
+            return None
+        bit = 1 << first_file
+        cols[1], d1[1], d2[1] = bit, (bit << 1) & full, bit >> 1
+        rank = 1
+    start = rank
+    free[rank] = ~(cols[rank] | d1[rank] | d2[rank]) & full
+    while rank >= start:
+        if free[rank] == 0:
+            rank = rank - 1     # Every square of this rank has been tried, backtrack
+            continue
+        bit = free[rank] & -free[rank]
+        free[rank] = free[rank] ^ bit
+        files[rank] = bit.bit_length() - 1
+        if rank == n - 1:
+            yield [x * n + files[x] for x in range(n)]
+            continue
+        cols[rank + 1] = cols[rank] | bit
+        d1[rank + 1] = ((d1[rank] | bit) << 1) & full
+        d2[rank + 1] = (d2[rank] | bit) >> 1
+        rank = rank + 1
+        free[rank] = ~(cols[rank] | d1[rank] | d2[rank]) & full
+    return None
+
+
+# Solution function: Yields the N-Queens solutions in exactly the order DLX finds them.
+# The bitboard search follows the choices of the DLX search: at each step the rank or file (ranks first, then files,
+# as the column headers) with the fewest free squares is filled, the first one on a tie, its squares tried in the
+# order of their rows. Each solution lists its rows in the order they were chosen, as DLX does.
+# Here the board is held as the ranks and files still empty, and the diagonals holding a queen:
+#   d1 = bit x + y, e = bit y - x + n - 1 (lined up with the files of rank x), g = bit x - y + n - 1 (with the ranks of
+#   file y)
+# Arguments: n = size of board, first_file = (optional) the file of the queen of the first rank, taken as already
+# chosen as with select_rows
+# Return: generator of solutions, each a list of row indices
+def dlx_order_solutions(n, first_file=None):
+    full = (1 << n) - 1
+    shift = n - 1
+    ranks, files, d1, e, g = full, full, 0, 0, 0
+    solution = []
+    if first_file is not None:
+        ranks, files = ranks ^ 1, files ^ (1 << first_file)
+        d1, e, g = 1 << first_file, 1 << (first_file + shift), 1 << (shift - first_file)
+        solution.append(first_file)
+    prefix = len(solution)
+    stack = []  # For each depth: [squares left to try, True for a rank, its index, the board before the choice]
+    while True:
+        best = [0, True, 0]     # Nothing to try, after a solution or a dead rank or file
+        if ranks == 0:
+            yield list(solution)
+        else:
+            # One pass over the empty ranks then files: find the best one, or one with no free square
+            best_size = n + 1
+            for is_rank, remaining in ((True, ranks), (False, files)):
+                while remaining:
+                    low = remaining & -remaining
+                    index = low.bit_length() - 1
+                    if is_rank:
+                        squares = files & ~(d1 >> index) & ~(e >> (shift - index))
+                    else:
+                        squares = ranks & ~(d1 >> index) & ~(g >> (shift - index))
+                    size = squares.bit_count()
+                    if size == 0:
+                        best, best_size = [0, True, 0], 0
+                        break
+                    if size < best_size:
+                        best, best_size = [squares, is_rank, index], size
+                    remaining = remaining ^ low
+                if best_size == 0:
+                    break
+        stack.append(best + [ranks, files, d1, e, g])
+        # Take the next square of the deepest rank or file, backtracking while it has none left
+        while stack:
+            level = stack[-1]
+            if len(solution) > prefix + len(stack) - 1:
+                solution.pop()  # The square tried last at this depth
+            if level[0] == 0:
+                stack.pop()
+                continue
+            low = level[0] & -level[0]
+            level[0] = level[0] ^ low
+            if level[1]:
+                x, y = level[2], low.bit_length() - 1
+            else:
+                x, y = low.bit_length() - 1, level[2]
+            solution.append(x * n + y)
+            ranks, files = level[3] & ~(1 << x), level[4] & ~(1 << y)
+            d1, e, g = level[5] | (1 << (x + y)), level[6] | (1 << (y - x + shift)), level[7] | (1 << (x - y + shift))
+            break
+        else:
+            return None     # The whole board has been searched
+
+
+# Main solution function: Yields every N-Queens solution with the bitboard search
+# Arguments: n = size of board
+# symmetry = if True only half of the first rank is searched and each solution is followed by its reflection, as
+# n_queen_symmetric_solutions
+# same_order = if True the solutions come in the same order as DLX (with the same symmetry), and each lists its rows
+# in the same order, see dlx_order_solutions. Otherwise they come rank by rank, which is faster.
+# Return: generator of solutions, each a list of row indices
+def n_queen_bitboard_solutions(n, symmetry=False, same_order=False):
+    solutions = dlx_order_solutions if same_order else rank_order_solutions
+    if not symmetry:
+        yield from solutions(n)
+        return None
+    for y in range((n + 1) // 2):
+        for rows in solutions(n, y):
+            yield rows
+            if 2 * y + 1 != n:
+                yield mirror_n_queen_rows(rows, n)
+    return None
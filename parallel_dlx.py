@@ -0,0 +1,152 @@
+# Imports
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import main
+
+# A problem is described by a small dictionary, so that it can be sent to other processes:
+#   "rows" = list of column index lists, one per row of the matrix
+#   "n_columns" = the number of columns of the matrix
+#   "n_queen" = (optional) the board size, if the columns should be transformed with transform_n_queen
+#   "names"/"n_primary" = (optional) the names of the columns and the number of primary columns, see set_columns
+
+# The list object of a worker process, built once by init_worker and reused for every subproblem
+worker_list = None
+
+
+# Problem function: Describes the N-Queens problem, see above
+# Arguments: n = size of board
+# Return: problem dictionary
+def n_queen_problem(n):
+    return {"rows": list(main.n_queen_rows(n)), "n_columns": main.n_queen_column_count(n), "n_queen": n}
+
+
+# Problem function: Describes a general exact cover problem, see above
+# Arguments: rows = iterable of column index lists, n_columns = the number of columns of the matrix
+# Return: problem dictionary
+def matrix_problem(rows, n_columns):
+    return {"rows": [list(row) for row in rows], "n_columns": n_columns}
+
+
+# Helper function: Builds the list object for a problem. No files are written.
+# Arguments: problem = problem dictionary, engine = see main.create_linked_list,
+# column_selection = see FourWayLinkedList.search
+# Return: the list object
+def build_list(problem, engine="array", column_selection="scan"):
+    n_primary = 2 * problem["n_queen"] if problem.get("n_queen") is not None else problem.get("n_primary")
+    overall_list = main.create_linked_list(engine, rows=problem["rows"], n_columns=problem["n_columns"],
+                                           n_primary=n_primary, column_selection=column_selection)
+    overall_list.build_from_rows(problem["rows"], problem["n_columns"])
+    if problem.get("n_queen") is not None:
+        overall_list.transform_n_queen(problem["n_queen"], write_file=False)
+    elif problem.get("names") is not None:
+        overall_list.set_columns(problem["names"], problem.get("n_primary"))
+    return overall_list
+
+
+# Helper function: Splits the search tree into subproblems, by following every branch down to a fixed depth.
+# Each subproblem is the list of rows chosen on the way down (its prefix). The prefixes are found in the order the
+# search itself would reach them, with the list's own column selection. With 'scan' the column chosen only depends on
+# the columns left, so searching the prefixes in order gives the solutions in the same order as a single search.
+# The buckets of 'size_buckets' also depend on the order of the earlier covers, so its prefixes come from the bucket
+# search itself, stopped at the depth. Each prefix is then searched with buckets of its own, so the solutions are the
+# same but may come in a different order to a single size_buckets search (as size_buckets already differs from scan).
+# Branches ending in a dead constraint above the depth are dropped, solutions above the depth are kept as prefixes.
+# Arguments: overall_list = the list object, depth = the number of levels to split
+# Return: list of prefixes (row index lists)
+def split_prefixes(overall_list, depth):
+    if overall_list.column_selection == "size_buckets":
+        start = overall_list.prefix_length
+        return [overall_list.solution_rows()[start:] for _ in overall_list.search_size_buckets(depth=depth)]
+    prefixes = []
+    prefix = []
+
+    def expand():
+        rows = overall_list.best_column_rows()
+        if rows is None or len(prefix) == depth:
+            prefixes.append(list(prefix))
+            return None
+        for row in rows:
+            overall_list.select_rows([row])
+            prefix.append(row)
+            expand()
+            prefix.pop()
+            overall_list.unselect_rows(1)
+        return None
+
+    expand()
+    return prefixes
+
+
+# Worker function: Builds the worker's list object once, when its process starts
+# Arguments: problem, engine, column_selection = see build_list
+# Return: None
+def init_worker(problem, engine, column_selection):
+    global worker_list
+    worker_list = build_list(problem, engine, column_selection)
+    return None
+
+
+# Worker function: Searches the subtree below a single prefix
+# Arguments: prefix = the rows chosen above the subtree, collect = if True return the solutions, otherwise the count
+# Return: list of solutions (row index lists) or the number of solutions
+def search_prefix(prefix, collect=False):
+    worker_list.select_rows(prefix)
+    try:
+        if collect:
+            return list(worker_list.iter_solutions())
+        return worker_list.count_solutions()
+    finally:
+        worker_list.unselect_rows()
+
+
+# Helper function: Searches every prefix with a pool of worker processes, yielding the results in prefix order.
+# The prefixes are handed out one at a time, so a worker that finishes a small subtree simply takes the next prefix.
+# Arguments: problem = problem dictionary, workers = number of processes, depth = number of levels to split,
+# engine/column_selection = see build_list, collect = see search_prefix
+# Return: generator of the result of each prefix
+def map_prefixes(problem, workers=None, depth=2, engine="array", column_selection="scan", collect=False):
+    prefixes = split_prefixes(build_list(problem, engine, column_selection), depth)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(problem, engine, column_selection)) as executor:
+        yield from executor.map(search_prefix, prefixes, [collect] * len(prefixes), chunksize=1)
+
+
+# Main parallel function: Counts the solutions of a problem using several processes
+# Arguments: see map_prefixes, workers = None uses every core
+# Return: total number of solutions
+def parallel_count(problem, workers=None, depth=2, engine="array", column_selection="scan"):
+    return sum(map_prefixes(problem, workers, depth, engine, column_selection))
+
+
+# Main parallel function: Yields the solutions of a problem found by several processes.
+# The solutions come out in the same order as a single process search, whichever worker finds them (for 'scan', see
+# split_prefixes).
+# Arguments: see map_prefixes
+# Return: generator of solutions, each a list of row indices
+def parallel_solutions(problem, workers=None, depth=2, engine="array", column_selection="scan"):
+    for solutions in map_prefixes(problem, workers, depth, engine, column_selection, collect=True):
+        yield from solutions
+
+
+# Benchmark function: Times parallel_count on N-Queens for every number of workers from 1 to max_workers
+# Arguments: n = size of board, max_workers = largest number of processes (default every core), depth/engine = see
+# map_prefixes
+# Return: dictionary of the execution time for each number of workers
+def scaling_report(n, max_workers=None, depth=2, engine="array"):
+    if max_workers is None:
+        max_workers = os.cpu_count()
+    problem = n_queen_problem(n)
+    times = {}
+    print("N-Queens, N = {0}, split at depth {1}".format(n, depth))
+    print("workers\tsolutions\ttime (s)\tspeedup")
+    for workers in range(1, max_workers + 1):
+        start_time = time.perf_counter()
+        total = parallel_count(problem, workers, depth, engine)
+        times[workers] = time.perf_counter() - start_time
+        print("{0}\t{1}\t\t{2:.3f}\t\t{3:.2f}x".format(workers, total, times[workers], times[1] / times[workers]))
+    return times
+
+
+if __name__ == "__main__":
+    scaling_report(12)
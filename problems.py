@@ -0,0 +1,150 @@
+# Imports
+import random
+
+# Exact cover problems other than N-Queens, described by the problem dictionaries of parallel_dlx:
+#   "rows" = list of column index lists, one per row of the matrix
+#   "n_columns" = the number of columns of the matrix
+# so they can be solved with any engine, in parallel or on remote workers, and benchmarked (see benchmark.py).
+
+# Sudoku puzzles, read row by row with '0' or '.' for an empty cell. Each has exactly one solution.
+SUDOKU_PUZZLES = {
+    "easy": "003020600900305001001806400008102900700000008006708200002609500800203009005010300",
+    "hard": "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+    "inkala": "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+}
+SUDOKU_COLUMNS = 4 * 81     # Each cell is filled, each row/column/box holds each digit once
+
+# The twelve pentominoes, '#' marking a square
+PENTOMINOES = {
+    "F": [".##", "##.", ".#."],
+    "I": ["#####"],
+    "L": ["####", "#..."],
+    "N": ["##..", ".###"],
+    "P": ["##", "##", "#."],
+    "T": ["###", ".#.", ".#."],
+    "U": ["#.#", "###"],
+    "V": ["#..", "#..", "###"],
+    "W": ["#..", "##.", ".##"],
+    "X": [".#.", "###", ".#."],
+    "Y": ["####", ".#.."],
+    "Z": ["##.", ".#.", ".##"],
+}
+
+
+# Sudoku function: Every placement of a digit in a cell that agrees with the puzzle's givens
+# Arguments: puzzle = string of 81 characters, see SUDOKU_PUZZLES
+# Return: list of (rank, file, digit) tuples, from 0, in the order of sudoku_problem's rows
+def sudoku_placements(puzzle):
+    if len(puzzle) != 81:
+        raise ValueError("A sudoku puzzle has 81 cells, not {0}".format(len(puzzle)))
+    placements = []
+    for cell, given in enumerate(puzzle):
+        for d in range(9):
+            if given in ".0" or int(given) == d + 1:
+                placements.append((cell // 9, cell % 9, d))
+    return placements
+
+
+# Sudoku function: The exact cover problem of a sudoku puzzle
+# Columns: 0-80 cell filled, 81-161 rank has digit, 162-242 file has digit, 243-323 box has digit
+# Arguments: puzzle = string of 81 characters, see SUDOKU_PUZZLES
+# Return: problem dictionary
+def sudoku_problem(puzzle):
+    rows = []
+    for r, f, d in sudoku_placements(puzzle):
+        box = (r // 3) * 3 + f // 3
+        rows.append([r * 9 + f, 81 + r * 9 + d, 162 + f * 9 + d, 243 + box * 9 + d])
+    return {"rows": rows, "n_columns": SUDOKU_COLUMNS}
+
+
+# Sudoku function: Fills in a puzzle from a solution
+# Arguments: puzzle = string of 81 characters, rows = the row indices of a solution of sudoku_problem(puzzle)
+# Return: the solved grid, as a string of 81 digits
+def sudoku_solution(puzzle, rows):
+    placements = sudoku_placements(puzzle)
+    grid = ["0"] * 81
+    for row in rows:
+        r, f, d = placements[row]
+        grid[r * 9 + f] = str(d + 1)
+    return "".join(grid)
+
+
+# Tiling function: Every distinct rotation and reflection of a piece
+# Arguments: shape = list of strings, '#' marking a square
+# Return: list of orientations, each a sorted tuple of (rank, file) squares moved to start at (0, 0)
+def piece_orientations(shape):
+    squares = [(r, f) for r, line in enumerate(shape) for f, mark in enumerate(line) if mark == "#"]
+    orientations = []
+    for _ in range(2):
+        for _ in range(4):
+            squares = [(f, -r) for r, f in squares]     # Rotate a quarter turn
+            low_r = min(r for r, f in squares)
+            low_f = min(f for r, f in squares)
+            orientation = tuple(sorted((r - low_r, f - low_f) for r, f in squares))
+            if orientation not in orientations:
+                orientations.append(orientation)
+        squares = [(r, -f) for r, f in squares]     # Reflect
+    return orientations
+
+
+# Tiling function: The exact cover problem of tiling a rectangle with the twelve pentominoes, each used once
+# Columns: 0-11 the pieces (in PENTOMINOES order), then one per square of the board, rank by rank
+# Every tiling is counted once for each symmetry of the board, e.g. the 3 by 20 board has 2 tilings, so 8 solutions.
+# Arguments: height/width = the size of the board, height * width must be 60
+# Return: problem dictionary
+def pentomino_problem(height, width):
+    if height * width != 5 * len(PENTOMINOES):
+        raise ValueError("The pentominoes cover 60 squares, not {0}".format(height * width))
+    rows = []
+    for piece, name in enumerate(PENTOMINOES):
+        for orientation in piece_orientations(PENTOMINOES[name]):
+            size_r = max(r for r, f in orientation) + 1
+            size_f = max(f for r, f in orientation) + 1
+            for top in range(height - size_r + 1):
+                for left in range(width - size_f + 1):
+                    rows.append([piece] + [len(PENTOMINOES) + (top + r) * width + left + f for r, f in orientation])
+    return {"rows": rows, "n_columns": len(PENTOMINOES) + height * width}
+
+
+# Tiling function: The exact cover problem of tiling a rectangle with dominoes
+# Columns: one per square of the board, rank by rank. Each row is a domino lying across two neighbouring squares.
+# The count grows exponentially with the board (12988816 tilings of 8 by 8), but the same uncovered squares are reached
+# again and again, so memo_count.py counts even large boards in moments.
+# Arguments: height/width = the size of the board
+# Return: problem dictionary
+def domino_problem(height, width):
+    rows = []
+    for r in range(height):
+        for f in range(width):
+            if f + 1 < width:
+                rows.append([r * width + f, r * width + f + 1])
+            if r + 1 < height:
+                rows.append([r * width + f, (r + 1) * width + f])
+    return {"rows": rows, "n_columns": height * width}
+
+
+# Random function: A seeded random exact cover problem, the same seed always gives the same matrix
+# A solution is planted first, by cutting the shuffled columns into rows of 1 to max_planted columns, so every case has
+# at least one solution. The other rows hold each column with probability density (and at least one column), and every
+# row is then shuffled into place.
+# Arguments: n_rows/n_columns = the size of the matrix, density = the chance of each 1 in the random rows
+# seed = the random seed, max_planted = the largest row of the planted solution
+# Return: problem dictionary
+def random_problem(n_rows, n_columns, density=0.1, seed=0, max_planted=4):
+    generator = random.Random(seed)
+    columns = list(range(n_columns))
+    generator.shuffle(columns)
+    rows = []
+    while columns and len(rows) < n_rows:
+        size = generator.randint(1, max_planted)
+        rows.append(sorted(columns[:size]))
+        columns = columns[size:]
+    if columns:
+        raise ValueError("{0} rows are too few to plant a solution over {1} columns".format(n_rows, n_columns))
+    planted = sorted(j for row in rows for j in row)
+    assert planted == list(range(n_columns)), "The planted rows must partition the columns"
+    while len(rows) < n_rows:
+        row = [j for j in range(n_columns) if generator.random() < density]
+        rows.append(row if row else [generator.randrange(n_columns)])
+    generator.shuffle(rows)
+    return {"rows": rows, "n_columns": n_columns}
@@ -0,0 +1,181 @@
+# Imports
+import itertools
+import math
+
+# Reduction of an exact cover problem before its list is built. Every change keeps the solutions the same, once they
+# are mapped back to the original rows with Reduction.expand:
+#   duplicate rows = rows covering the same columns, only the first is kept (each solution using it stands for one
+#   solution per copy)
+#   unusable rows = rows covering no primary column, which the search can never choose
+#   forced rows = the only row left in a primary column must be in every solution, so it is chosen up front and every
+#   row sharing a column with it (a conflicting row) removed
+#   empty primary columns = a primary column with no rows left, the problem has no solutions
+#   dominated columns = when every row of primary column i also covers column j, the rows of j not covering i can
+#   never be chosen, so they are removed (dominated rows) and j, now identical to i, is removed too
+
+
+# Class declaration for the result of reduce_problem.
+#   rows/n_columns/n_primary = the reduced problem, its primary columns first
+#   row_map[i] = the original rows of reduced row i, more than one when duplicates were dropped
+#   column_map[j] = the original column of reduced column j
+#   forced = the rows chosen up front, part of every solution, each as the list of its original copies
+#   infeasible = True if the reduction found the problem has no solutions, then the reduced problem is empty
+#   report = dictionary of what was removed, see reduce_problem
+class Reduction:
+    def __init__(self, rows, n_columns, n_primary, row_map, column_map, forced, infeasible, report):
+        self.rows = rows
+        self.n_columns = n_columns
+        self.n_primary = n_primary
+        self.row_map = row_map
+        self.column_map = column_map
+        self.forced = forced
+        self.infeasible = infeasible
+        self.report = report
+
+    # Helper function: The reduced problem as a problem dictionary, see parallel_dlx
+    # Arguments: None
+    # Return: problem dictionary
+    def problem(self):
+        return {"rows": self.rows, "n_columns": self.n_columns, "n_primary": self.n_primary,
+                "names": self.column_names()}
+
+    # Helper function: The names of the reduced columns, those of the original columns they stand for
+    # Arguments: names = (optional) the original column names, default "Constraint {j}" as in build_from_rows
+    # Return: list of names
+    def column_names(self, names=None):
+        if names is None:
+            return ["Constraint {0}".format(j) for j in self.column_map]
+        return [names[j] for j in self.column_map]
+
+    # Solution function: The original solutions standing for a solution of the reduced problem
+    # Arguments: rows = the reduced row indices of a solution
+    # Return: generator of sorted lists of original row indices, one per choice of duplicate rows
+    def expand(self, rows):
+        for choice in itertools.product(*self.forced, *(self.row_map[row] for row in rows)):
+            yield sorted(choice)
+
+    # Solution function: The number of original solutions standing for a solution of the reduced problem
+    # Arguments: rows = the reduced row indices of a solution
+    # Return: integer
+    def multiplicity(self, rows):
+        return math.prod(len(copies) for copies in self.forced) * math.prod(len(self.row_map[row]) for row in rows)
+
+    # Helper function: True if no duplicate rows were dropped, so each reduced solution is a single original one
+    # Arguments: None
+    # Return: boolean
+    def one_to_one(self):
+        return self.report["duplicate_rows"] == 0
+
+
+# Main reduction function: Reduces an exact cover problem, see the top of this file
+# Arguments: rows = list of column index lists, one per row, n_columns = the number of columns
+# n_primary = (optional) the number of primary columns, the columns from n_primary on are secondary. All of them
+# are primary if None.
+# Return: Reduction. Its report holds the number of original/reduced rows and columns and of each kind of removal,
+# and the first empty primary column found (original index), or None.
+def reduce_problem(rows, n_columns, n_primary=None):
+    if n_primary is None:
+        n_primary = n_columns
+    report = {"rows": len(rows), "columns": n_columns, "duplicate_rows": 0, "unusable_rows": 0, "forced_rows": 0,
+              "conflicting_rows": 0, "dominated_columns": 0, "dominated_rows": 0, "empty_primary_column": None}
+    # The live rows (row -> set of columns) and columns (column -> set of rows), every original row and column at first
+    row_columns = {}
+    copies = {}     # Kept row -> its original rows
+    first_copy = {}     # Column set -> the kept row
+    for i, row in enumerate(rows):
+        key = frozenset(row)
+        if key in first_copy:
+            copies[first_copy[key]].append(i)
+            report["duplicate_rows"] = report["duplicate_rows"] + 1
+        elif not any(j < n_primary for j in key):
+            report["unusable_rows"] = report["unusable_rows"] + 1
+        else:
+            first_copy[key] = i
+            copies[i] = [i]
+            row_columns[i] = set(key)
+    column_rows = {j: set() for j in range(n_columns)}
+    for i, columns in row_columns.items():
+        for j in columns:
+            column_rows[j].add(i)
+    forced = []
+
+    def remove_row(i, kind):
+        for j in row_columns.pop(i):
+            column_rows[j].discard(i)
+        report[kind] = report[kind] + 1
+
+    def infeasible(j):
+        report["empty_primary_column"] = j
+        report["reduced_rows"], report["reduced_columns"] = 0, 0
+        return Reduction([], 0, 0, [], [], [], True, report)
+
+    changed = True
+    while changed:
+        changed = False
+        for j in range(n_primary):
+            if j not in column_rows:
+                continue
+            if not column_rows[j]:
+                return infeasible(j)
+            if len(column_rows[j]) == 1:    # Forced row
+                i = next(iter(column_rows[j]))
+                for k in row_columns[i]:
+                    for other in list(column_rows[k]):
+                        if other != i:
+                            remove_row(other, "conflicting_rows")
+                for k in row_columns.pop(i):
+                    del column_rows[k]
+                forced.append(copies[i])
+                report["forced_rows"] = report["forced_rows"] + 1
+                changed = True
+                continue
+            # Every column covered by all of the rows of j is dominated by j
+            dominated = set.intersection(*(row_columns[i] for i in column_rows[j]))
+            dominated.discard(j)
+            for k in sorted(dominated):
+                for other in list(column_rows[k] - column_rows[j]):
+                    remove_row(other, "dominated_rows")
+                for i in column_rows.pop(k):
+                    row_columns[i].discard(k)
+                report["dominated_columns"] = report["dominated_columns"] + 1
+                changed = True
+    for j in range(n_primary):
+        if j in column_rows and not column_rows[j]:
+            return infeasible(j)
+    # Number the remaining rows and columns in their original order, primary columns staying first
+    column_map = sorted(column_rows)
+    new_column = {j: k for k, j in enumerate(column_map)}
+    reduced_rows, row_map = [], []
+    for i in sorted(row_columns):
+        reduced_rows.append(sorted(new_column[j] for j in row_columns[i]))
+        row_map.append(copies[i])
+    report["reduced_rows"], report["reduced_columns"] = len(reduced_rows), len(column_map)
+    return Reduction(reduced_rows, len(column_map), sum(j < n_primary for j in column_map), row_map, column_map,
+                     sorted(forced), False, report)
+
+
+# Helper function: Builds a list object from a reduction, the columns named after the original columns
+# Arguments: overall_list = an empty list object, reduction = see reduce_problem
+# names = (optional) the original column names, log = as load_exact_cover
+# Return: master_node = the master node of the list object
+def build_reduced(overall_list, reduction, names=None, log=None):
+    if log is None:
+        master_node = overall_list.build_from_rows(reduction.rows, reduction.n_columns)
+    else:
+        master_node = overall_list.convert_sparse_exact_cover(reduction.rows, reduction.n_columns, log)
+    overall_list.set_columns(reduction.column_names(names), reduction.n_primary)
+    return master_node
+
+
+# Solution function: Counts the original solutions of a list built by build_reduced
+# Arguments: overall_list = the list object, reduction = see reduce_problem
+# Return: the number of original solutions, also stored in overall_list.total_solutions
+def count_reduced(overall_list, reduction):
+    if reduction.infeasible:
+        total = 0
+    elif reduction.one_to_one():
+        total = overall_list.count_solutions()
+    else:
+        total = sum(reduction.multiplicity(rows) for rows in overall_list.iter_solutions())
+    overall_list.total_solutions = total
+    return total
@@ -0,0 +1,75 @@
+# Imports
+import json
+import time
+
+
+# Class declaration for the counters of an instrumented search.
+# Assign a SearchStats to a list object's stats attribute and every search of the list (search, dlx_iterative,
+# iter_solutions, count_solutions, ...) runs an instrumented copy of the search, which counts its work here. With
+# stats set to None (the default) the normal search runs, which has no counters at all.
+# The counters add up over every search run with the same SearchStats, e.g. over the subproblems of parallel_dlx.
+#   nodes[k] = the number of nodes of the search tree at depth k (k rows chosen), including solutions and dead ends
+#   branches[k] = the number of rows tried at depth k
+#   updates = the number of nodes unlinked from their column while covering, Knuth's "updates". Uncovering relinks
+#   exactly as many, so they are not counted again.
+#   backtracks = the number of dead constraints found (a primary column with no rows left)
+#   solutions = the number of solutions found
+#   search_time = the time spent in the search, in seconds
+class SearchStats:
+    def __init__(self):
+        self.nodes = []
+        self.branches = []
+        self.updates = 0
+        self.backtracks = 0
+        self.solutions = 0
+        self.search_time = 0.0
+        self.start_time = None
+
+    # Search function: Counts a node of the search tree
+    # Arguments: k = its depth
+    # Return: None
+    def enter(self, k):
+        while len(self.nodes) <= k:
+            self.nodes.append(0)
+            self.branches.append(0)
+        self.nodes[k] = self.nodes[k] + 1
+        return None
+
+    # Search function: Starts timing a search, see stop
+    # Arguments: None
+    # Return: None
+    def start(self):
+        self.start_time = time.perf_counter()
+        return None
+
+    # Search function: Stops timing a search, adding its time to search_time
+    # Arguments: None
+    # Return: None
+    def stop(self):
+        if self.start_time is not None:
+            self.search_time = self.search_time + time.perf_counter() - self.start_time
+            self.start_time = None
+        return None
+
+    # Report function: The counters as a dictionary, ready for JSON
+    # The branching factor of a level is the average number of rows tried per node at that depth.
+    # Arguments: None
+    # Return: dictionary
+    def report(self):
+        levels = []
+        for k in range(len(self.nodes)):
+            levels.append({"depth": k, "nodes": self.nodes[k], "branches": self.branches[k],
+                           "branching_factor": self.branches[k] / self.nodes[k] if self.nodes[k] else 0.0})
+        return {"nodes": sum(self.nodes), "branches": sum(self.branches), "updates": self.updates,
+                "backtracks": self.backtracks, "solutions": self.solutions, "search_time": self.search_time,
+                "levels": levels}
+
+    # Report function: The report as JSON text, optionally also written to a file
+    # Arguments: file_name = (optional) the file to write the report to
+    # Return: the JSON text
+    def to_json(self, file_name=None):
+        text = json.dumps(self.report(), indent=2)
+        if file_name is not None:
+            with open(file_name, "w") as file:
+                file.write(text + "\n")
+        return text
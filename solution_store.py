@@ -0,0 +1,107 @@
+# Imports
+import hashlib
+import os
+import struct
+import numpy as np
+
+# Binary solution files hold a 64 byte header, followed by one fixed width record per solution.
+# Each record is the row indices of the solution as unsigned integers (uint16, or uint32 for matrices with 65535 rows
+# or more), padded with the largest value of the type when a solution has fewer rows than the record width.
+# Header, little endian:
+#   magic (4 bytes) = b"DLXS", version (uint16), item size in bytes (uint8), unused (uint8), record width (uint32),
+#   number of matrix rows (uint64), number of matrix columns (uint64), SHA-256 of the matrix (32 bytes)
+MAGIC = b"DLXS"
+VERSION = 1
+HEADER_FORMAT = "<4sHBBIQQ32s"
+HEADER_SIZE = 64
+
+
+# Helper function: Hashes an exact cover matrix, so a solution file can be matched to the matrix it solves
+# Arguments: rows = iterable of column index lists, one per row, n_columns = the number of columns of the matrix
+# Return: 32 byte SHA-256 digest
+def matrix_digest(rows, n_columns):
+    digest = hashlib.sha256()
+    digest.update(struct.pack("<Q", n_columns))
+    for row in rows:
+        digest.update(struct.pack("<I", len(row)))
+        digest.update(np.asarray(sorted(row), dtype="<u4").tobytes())
+    return digest.digest()
+
+
+# Helper function: The record type for a matrix with a given number of rows
+# Arguments: n_rows = the number of rows of the matrix
+# Return: numpy dtype
+def record_dtype(n_rows):
+    if n_rows < 0xFFFF:
+        return np.dtype("<u2")
+    return np.dtype("<u4")
+
+
+# Helper function: Packs the header of a binary solution file
+# Arguments: dtype = record type, width = record width, n_rows/n_columns = matrix shape, digest = see matrix_digest
+# Return: header bytes
+def pack_header(dtype, width, n_rows, n_columns, digest):
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, dtype.itemsize, 0, width, n_rows, n_columns, digest)
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+# Class declaration for the reader of binary solution files.
+# The records are memory mapped rather than read, so even very large files open instantly and only the solutions
+# actually looked at are loaded from disk. The number of solutions comes from the file size, so a file left behind by
+# an interrupted run can still be read.
+class SolutionStore:
+    def __init__(self, file_name):
+        self.file_name = file_name
+        with open(file_name, "rb") as file:
+            header = file.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or header[:4] != MAGIC:
+            raise ValueError("'{0}' is not a binary solution file".format(file_name))
+        _, version, item_size, _, self.width, self.n_rows, self.n_columns, self.digest = struct.unpack(
+            HEADER_FORMAT, header[:struct.calcsize(HEADER_FORMAT)])
+        if version != VERSION:
+            raise ValueError("Unsupported binary solution file version: {0}".format(version))
+        self.dtype = np.dtype("<u{0}".format(item_size))
+        self.padding = np.iinfo(self.dtype).max
+        count = 0
+        if self.width > 0:  # Records of width 0 (no primary columns, only the empty solution) take up no space
+            count = (os.path.getsize(file_name) - HEADER_SIZE) // (self.width * item_size)
+        if count > 0:
+            self.records = np.memmap(file_name, dtype=self.dtype, mode="r", offset=HEADER_SIZE,
+                                     shape=(count, self.width))
+        else:
+            self.records = np.zeros((0, self.width), dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    # Reader function: The row indices of a single solution, without padding
+    # Arguments: k = the index of the solution (from 0)
+    # Return: list of row indices
+    def __getitem__(self, k):
+        record = self.records[k]
+        return record[record != self.padding].tolist()
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    # Reader function: Checks that the file solves a given matrix
+    # Arguments: rows/n_columns = the matrix, as for matrix_digest
+    # Return: True if the matrix matches the header
+    def matches(self, rows, n_columns):
+        return self.digest == matrix_digest(rows, n_columns)
+
+    # Specific NQueens function: Turns a solution back into a chess board
+    # Arguments: k = the index of the solution, n = size of board
+    # Return: n by n numpy array, with a 1 wherever there is a queen
+    def board(self, k, n):
+        board = np.zeros((n, n), dtype=np.int8)
+        for row in self[k]:
+            board[row // n, row % n] = 1
+        return board
+
+    # Reader function: Names the rows of a solution as they appear in the text output, e.g. "Rank 3, File 5"
+    # Arguments: k = the index of the solution, overall_list = a list object built from the same matrix
+    # Return: list of strings
+    def row_labels(self, k, overall_list):
+        return [overall_list.row_label(row) for row in self[k]]
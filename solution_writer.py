@@ -0,0 +1,124 @@
+# Imports
+import abc
+import json
+import os
+import numpy as np
+from solution_store import matrix_digest, pack_header, record_dtype
+
+# Size of the output buffer, solutions are only written to disk once this much text has built up
+BUFFER_SIZE = 1 << 20
+
+
+# Class declaration for the solution writers.
+# A writer keeps one file handle open for a whole run and buffers its output in large blocks, instead of opening the
+# output file for every solution. Use it as a context manager (or call close) so the buffer is flushed and the file
+# closed when the search finishes or is interrupted.
+# The subclasses below decide the format of each solution, each must define format_solution (a writer without it cannot
+# be created).
+class SolutionWriter(abc.ABC):
+    def __init__(self, file_name, mode="a", buffer_size=BUFFER_SIZE):
+        self.file_name = file_name      # Store name of the file for the user
+        self.file = open(file_name, mode, buffering=buffer_size)
+        self.total_solutions = 0        # Used to number the solutions
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    # File function: Writes a single solution
+    # Arguments: rows = the row indices of the solution, in the order they were chosen
+    # Return: None
+    def write_solution(self, rows):
+        self.total_solutions = self.total_solutions + 1
+        self.file.write(self.format_solution(rows))
+        return None
+
+    # File function: Formats a single solution, defined by each format
+    # Arguments: rows = the row indices of the solution
+    # Return: the text to be written
+    @abc.abstractmethod
+    def format_solution(self, rows):
+        pass
+
+    # File function: Flushes the buffer and closes the file, safe to call more than once
+    # Arguments: None
+    # Return: None
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+        return None
+
+
+# Class declaration for the human readable text format, identical to FourWayLinkedList.file_write_solution.
+# Each row is written as the names of its first two columns, e.g. "Rank 3, File 5" for N-Queens.
+class TextSolutionWriter(SolutionWriter):
+    def __init__(self, file_name, overall_list, mode="a", buffer_size=BUFFER_SIZE):
+        super().__init__(file_name, mode, buffer_size)
+        self.overall_list = overall_list    # Used to name the rows
+
+    def format_solution(self, rows):
+        text = "\n\nSolutions:\n\n" if self.total_solutions == 1 else ""
+        text = text + "Solution {0}\n".format(self.total_solutions)
+        for row in rows:
+            text = text + self.overall_list.row_label(row) + "\n"
+        return text + "\n"
+
+
+# Class declaration for the CSV format: one line per solution, holding its row indices
+class CsvSolutionWriter(SolutionWriter):
+    def format_solution(self, rows):
+        return ",".join(map(str, rows)) + "\n"
+
+
+# Class declaration for the NDJSON format: one JSON object per line, holding the solution number and its row indices
+class NdjsonSolutionWriter(SolutionWriter):
+    def format_solution(self, rows):
+        return json.dumps({"solution": self.total_solutions, "rows": list(rows)}) + "\n"
+
+
+# Class declaration for the compact binary format, one fixed width record of row indices per solution.
+# See solution_store.py for the layout of the file, and the SolutionStore class to read it back.
+class BinarySolutionWriter(SolutionWriter):
+    def __init__(self, file_name, n_rows, n_columns, digest, width, buffer_size=BUFFER_SIZE):
+        super().__init__(file_name, "wb", buffer_size)
+        self.dtype = record_dtype(n_rows)
+        self.width = width      # The most rows a solution can have
+        self.record = np.full(width, np.iinfo(self.dtype).max, dtype=self.dtype)   # Reused for every solution
+        self.file.write(pack_header(self.dtype, width, n_rows, n_columns, digest))
+
+    def format_solution(self, rows):
+        if len(rows) > self.width:
+            raise ValueError("Solution has {0} rows, the records only hold {1}".format(len(rows), self.width))
+        self.record[:len(rows)] = rows
+        self.record[len(rows):] = np.iinfo(self.dtype).max
+        return self.record.tobytes()
+
+
+# The output formats, along with the extension of their file
+OUTPUT_FORMATS = {"text": ".txt", "csv": ".csv", "ndjson": ".ndjson", "binary": ".dlxs"}
+
+
+# Helper function: Opens a writer for a list object's solutions
+# Text is appended to the list's main output file, after its introduction. The other formats are written to a file
+# of their own next to it, with the same name and their own extension.
+# Arguments: overall_list = the list object, output_format = one of OUTPUT_FORMATS
+# width = (binary only) the most rows a solution can have, by default the number of primary columns
+# Return: the writer
+def open_solution_writer(overall_list, output_format="text", width=None):
+    if output_format == "text":
+        return TextSolutionWriter(overall_list.main_file, overall_list)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError("Unknown output format: {0}".format(output_format))
+    file_name = os.path.splitext(overall_list.main_file)[0] + OUTPUT_FORMATS[output_format]
+    if output_format == "csv":
+        return CsvSolutionWriter(file_name, "w")
+    if output_format == "binary":
+        if width is None:
+            width = overall_list.primary_column_count()     # Every row chosen covers at least one primary column
+        n_columns = overall_list.column_count()
+        digest = matrix_digest(overall_list.matrix_rows(), n_columns)
+        return BinarySolutionWriter(file_name, len(overall_list.row_nodes), n_columns, digest, width)
+    return NdjsonSolutionWriter(file_name, "w")
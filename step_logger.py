@@ -0,0 +1,148 @@
+# Imports
+import queue
+import threading
+
+# Log levels, each one also logs everything of the levels below it
+LOG_OFF = 0             # Nothing is logged
+LOG_SOLUTIONS = 1       # Each solution found
+LOG_BRANCHES = 2        # Each row chosen by the search, with its depth
+LOG_BACKTRACKS = 3      # Each dead constraint forcing a backtrack, the full log
+LOG_LEVELS = {"off": LOG_OFF, "solutions": LOG_SOLUTIONS, "branches": LOG_BRANCHES, "backtracks": LOG_BACKTRACKS}
+
+# Kinds of event put on the queue, each event is a tuple of integers: (kind, a, b)
+EVENT_BRANCH = 0        # a = row index, b = depth
+EVENT_BACKTRACK = 1     # a = column index
+EVENT_SOLUTION = 2      # a = solution number, b = the row indices of the solution
+
+# Most events waiting to be written, once full the search waits for the logger thread to catch up
+MAX_EVENTS = 1 << 16
+# Size of the log file buffer
+BUFFER_SIZE = 1 << 20
+
+
+# Helper function: Turns the log argument of the search functions into a log level
+# Arguments: log = True (the full log), False/None (no log), a log level or the name of one (see LOG_LEVELS)
+# Return: log level
+def log_level(log):
+    if log is None or log is False:
+        return LOG_OFF
+    if log is True:
+        return LOG_BACKTRACKS
+    if isinstance(log, str):
+        if log not in LOG_LEVELS:
+            raise ValueError("Unknown log level: {0}".format(log))
+        return LOG_LEVELS[log]
+    return int(log)
+
+
+# Helper function: The functions a search calls for each branch and each backtrack
+# Arguments: logger = the StepLogger of the search, or None
+# Return: (branch function, backtrack function), each None if that event is not logged
+def log_hooks(logger):
+    if logger is None:
+        return None, None
+    return (logger.branch if logger.branches else None), (logger.backtrack if logger.backtracks else None)
+
+
+# Class declaration for the step logger.
+# The search only puts small tuples of integers on a bounded queue, a background thread turns them into text and
+# writes them to the log file, which stays open (and buffered) for the whole run. With sample = k only every k-th
+# branch and backtrack is logged, solutions are always logged.
+# The names are read from the list object by the logger thread, this is safe as the search never changes the names
+# or the links within a row.
+# Use it as a context manager (or call close) so every event is written and the file closed.
+class StepLogger:
+    def __init__(self, overall_list, level=LOG_BACKTRACKS, sample=1, max_events=MAX_EVENTS, buffer_size=BUFFER_SIZE):
+        self.overall_list = overall_list    # Used to name the rows and columns
+        self.solutions = level >= LOG_SOLUTIONS
+        self.branches = level >= LOG_BRANCHES
+        self.backtracks = level >= LOG_BACKTRACKS
+        self.sample = max(1, sample)
+        self.countdown = self.sample    # Events left until the next sampled one
+        self.events = queue.Queue(max_events)
+        self.error = None               # The first error of the logger thread, raised by close
+        self.file = open(overall_list.log_file, "a", buffering=buffer_size)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    # Search function: Logs the choice of a row
+    # Arguments: row = the index of the row, k = the depth of the search
+    # Return: None
+    def branch(self, row, k):
+        self.countdown = self.countdown - 1
+        if self.countdown == 0:
+            self.countdown = self.sample
+            self.events.put((EVENT_BRANCH, row, k))
+        return None
+
+    # Search function: Logs a backtrack caused by a dead constraint
+    # Arguments: column = the index of the dead column
+    # Return: None
+    def backtrack(self, column):
+        self.countdown = self.countdown - 1
+        if self.countdown == 0:
+            self.countdown = self.sample
+            self.events.put((EVENT_BACKTRACK, column, 0))
+        return None
+
+    # Search function: Logs a solution
+    # Arguments: number = the solution number, rows = the row indices of the solution
+    # Return: None
+    def solution(self, number, rows):
+        self.events.put((EVENT_SOLUTION, number, rows))
+        return None
+
+    # File function: Writes a single event to the log, in the same format as the original log
+    # Arguments: kind, a, b = the event, see above
+    # Return: None
+    def write_event(self, kind, a, b):
+        overall_list = self.overall_list
+        if kind == EVENT_BRANCH:
+            self.file.write("k={0}\n{1}\n".format(b, "\t".join(overall_list.row_names(a))))
+        elif kind == EVENT_BACKTRACK:
+            self.file.write("BACKTRACK necessary,\t{0}\tis a dead constraint.\n".format(overall_list.column_name(a)))
+        else:
+            if a == 1:
+                self.file.write("\n\nSolutions:\n\n")
+            self.file.write("Solution {0}\n".format(a))
+            for row in b:
+                self.file.write(overall_list.row_label(row) + "\n")
+            self.file.write("\n")
+        return None
+
+    # Thread function: Writes the events from the queue until close is called.
+    # If writing fails the thread keeps emptying the queue, so the search is never left waiting on it, and close
+    # raises the error instead.
+    # Arguments: None
+    # Return: None
+    def run(self):
+        while True:
+            event = self.events.get()
+            if event is None:
+                return None
+            if self.error is None:
+                try:
+                    self.write_event(*event)
+                except Exception as error:
+                    self.error = error
+
+    # File function: Waits for every event to be written, then closes the log file. Safe to call more than once.
+    # Arguments: None
+    # Return: None
+    def close(self):
+        if self.thread.is_alive():
+            self.events.put(None)
+            self.thread.join()
+        if not self.file.closed:
+            self.file.close()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        return None
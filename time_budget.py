@@ -0,0 +1,31 @@
+# Imports
+import contextlib
+import time
+
+# Time budget of a search.
+# The budget is held by the list object as a deadline, a time.monotonic() value, which every search compares with the
+# clock once per node, before choosing its next column. A search out of time raises TimeBudgetExceeded there, never
+# halfway through a cover, so it still restores its links on the way out. Anything else (building the list, writing
+# and closing files) always runs to the end.
+# The deadline is a plain number and time.monotonic() is the same clock in every process of the machine, so it can be
+# handed to worker processes as it is, see components.component_count.
+
+
+# Exception raised inside the search when the time budget of a run is used up, see time_budget
+class TimeBudgetExceeded(Exception):
+    pass
+
+
+# Helper function: Gives the searches of a list object a number of seconds, after which they raise TimeBudgetExceeded
+# Arguments: overall_list = the list object, seconds = the budget, None for no limit
+# Return: context manager, giving the deadline (None for no limit)
+@contextlib.contextmanager
+def time_budget(overall_list, seconds):
+    if seconds is None:
+        yield None
+        return
+    overall_list.deadline = time.monotonic() + seconds
+    try:
+        yield overall_list.deadline
+    finally:
+        overall_list.deadline = None
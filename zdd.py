@@ -0,0 +1,132 @@
+# Imports
+import json
+import random
+from memo_count import CountCache, MAX_ENTRIES
+
+# Zero-suppressed decision diagrams (ZDDs) of every solution of a problem, built by Knuth's DXZ: the memoized dancing
+# links search of memo_search, where the value of each set of uncovered columns is the ZDD of its solutions.
+# Every set of uncovered columns is searched once, so a ZDD can hold far more solutions than could ever be listed.
+# Nodes are numbered from 0: node 0 is the empty family (no solutions, a dead end) and node 1 the family holding only
+# the empty solution (every primary column covered). Every other node n stands for the row row[n]:
+#   lo[n] = the node of the solutions without the row, hi[n] = the node of the rows chosen along with it
+# Children always have smaller numbers than their parents, and every solution is exactly one path from the root to
+# node 1, made of the rows of the hi edges it takes.
+
+
+# Class declaration for a ZDD, see above
+class ZDD:
+    def __init__(self):
+        self.row = [-1, -1]
+        self.lo = [0, 1]
+        self.hi = [0, 1]
+        self.root = 0
+        self.unique = {}    # (row, lo, hi) -> node, so equal nodes are only made once
+        self.counts = None  # Number of solutions of each node, see count
+
+    def __len__(self):
+        return len(self.row)
+
+    # Construction function: The node of a row, made only if no equal node exists.
+    # A row with no solutions below it is dropped (the zero-suppression rule), leaving its lo node.
+    # Arguments: row = the row, lo/hi = the nodes of the solutions without/with the row
+    # Return: node
+    def node(self, row, lo, hi):
+        if hi == 0:
+            return lo
+        key = (row, lo, hi)
+        node = self.unique.get(key)
+        if node is None:
+            node = len(self.row)
+            self.row.append(row)
+            self.lo.append(lo)
+            self.hi.append(hi)
+            self.unique[key] = node
+            self.counts = None
+        return node
+
+    # Count function: The number of solutions of every node, worked out once in a single pass from the bottom up
+    # Arguments: None
+    # Return: list of counts, one per node
+    def node_counts(self):
+        if self.counts is None or len(self.counts) != len(self.row):
+            counts = [0, 1]
+            for n in range(2, len(self.row)):
+                counts.append(counts[self.lo[n]] + counts[self.hi[n]])
+            self.counts = counts
+        return self.counts
+
+    # Count function: The number of solutions
+    # Arguments: None
+    # Return: integer, exact however large
+    def count(self):
+        return self.node_counts()[self.root]
+
+    # Solution function: A solution chosen uniformly at random, each one equally likely
+    # Arguments: generator = (optional) random.Random to draw from, e.g. seeded for repeatable samples
+    # Return: sorted list of row indices, or None if there are no solutions
+    def sample(self, generator=None):
+        if generator is None:
+            generator = random
+        counts = self.node_counts()
+        node = self.root
+        if counts[node] == 0:
+            return None
+        rows = []
+        while node > 1:
+            # Take the hi edge as often as the solutions through it make up of the node's solutions
+            if generator.randrange(counts[node]) < counts[self.hi[node]]:
+                rows.append(self.row[node])
+                node = self.hi[node]
+            else:
+                node = self.lo[node]
+        return sorted(rows)
+
+    # Solution function: Yields every solution, lo edges before hi edges
+    # Arguments: None
+    # Return: generator of sorted lists of row indices
+    def __iter__(self):
+        stack = [(self.root, None)]     # (node, the rows chosen above it as a linked list of (row, rest) pairs)
+        while stack:
+            node, chosen = stack.pop()
+            if node == 1:
+                rows = []
+                while chosen is not None:
+                    row, chosen = chosen
+                    rows.append(row)
+                yield sorted(rows)
+            elif node > 1:
+                stack.append((self.hi[node], (self.row[node], chosen)))
+                stack.append((self.lo[node], chosen))
+        return None
+
+    # Export function: Writes the ZDD to a file, either as text (one line per node: "node row lo hi", children before
+    # parents, then "root node") or as JSON, or as a Graphviz dot graph with dashed lo edges
+    # Arguments: file_name = the file, export_format = 'text', 'json' or 'dot'
+    # Return: None
+    def export(self, file_name, export_format="text"):
+        with open(file_name, "w") as file:
+            if export_format == "text":
+                for n in range(2, len(self.row)):
+                    file.write("{0} {1} {2} {3}\n".format(n, self.row[n], self.lo[n], self.hi[n]))
+                file.write("root {0}\n".format(self.root))
+            elif export_format == "json":
+                json.dump({"root": self.root, "row": self.row, "lo": self.lo, "hi": self.hi}, file)
+            elif export_format == "dot":
+                file.write("digraph zdd {\n  0 [shape=box, label=\"0\"];\n  1 [shape=box, label=\"1\"];\n")
+                for n in range(2, len(self.row)):
+                    file.write("  {0} [label=\"{1}\"];\n  {0} -> {2} [style=dashed];\n  {0} -> {3};\n".format(
+                        n, self.row[n], self.lo[n], self.hi[n]))
+                file.write("}\n")
+            else:
+                raise ValueError("Unknown export format: {0}".format(export_format))
+        return None
+
+
+# Main ZDD function: Builds the ZDD of every solution of a list object, below any rows already chosen with select_rows
+# Arguments: overall_list = the list object, max_entries = most sets of uncovered columns whose node is remembered.
+# A set that was forgotten is searched again, which only costs time: its nodes already exist, so it gives the same node.
+# Return: ZDD
+def build_zdd(overall_list, max_entries=MAX_ENTRIES):
+    zdd = ZDD()
+    zdd.root = overall_list.memo_search(CountCache(max_entries), lambda lo, row, hi: zdd.node(row, lo, hi))
+    return zdd